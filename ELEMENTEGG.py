@@ -9,28 +9,67 @@ import random
 import time
 import datetime
 import math
+import codecs
+import array
+import re
 import colorsys
+import collections
+import bisect
+import heapq
+import functools
+import threading
+import sqlite3
+import struct
+import zlib
 import pygame.mixer
 
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init()
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; egg spots fall back to per-Spot rendering
+    np = None
+
+# Fonts are needed at import time; the window, audio and assets wait for init_game()
+pygame.font.init()
 pygame.freetype.init()
 
 # Screen dimensions
 width, height = 900, 800
-screen = pygame.display.set_mode((width, height))
-clock = pygame.time.Clock()
+screen = None
 
 # Define colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 
+# Font registry and rendered-text cache
+TEXT_CACHE_SIZE = 1024
+_font_registry = {}
+
+def get_font(size, path=None):
+    """Return the shared Font for (path, size), loading it on first use."""
+    key = (path, size)
+    font = _font_registry.get(key)
+    if font is None:
+        try:
+            font = pygame.font.Font(path, size)
+        except (FileNotFoundError, OSError):
+            font = pygame.font.Font(None, size)  # e.g. the Windows emoji font on other platforms
+        _font_registry[key] = font
+    return font
+
+@functools.lru_cache(maxsize=TEXT_CACHE_SIZE)
+def _render_text_cached(font, text, color, antialias):
+    return font.render(text, antialias, color)
+
+def render_text(font, text, color, antialias=True):
+    """Render text through the LRU surface cache. Returned surfaces are shared; don't draw on them."""
+    return _render_text_cached(font, text, tuple(color), antialias)
+
 debug_mode = False
-debug_font = pygame.font.Font(None, 24)
+debug_font = get_font(24)
 
 SOUND_FILE = "sound_preference.json"
 MUSIC_FILE = "music_preference.json"
+PACING_FILE = "pacing_preference.json"
 THEME_SONG_1 = './SOUNDS/Element_Egg_001.mp3'
 THEME_SONG_2 = './SOUNDS/Element_Egg_002.mp3'
 
@@ -55,6 +94,17 @@ def save_music_preference(music_on, current_theme):
     with open(MUSIC_FILE, 'w') as f:
         json.dump({'music_on': music_on, 'current_theme': current_theme}, f)
 
+# Frame pacing: run at max_fps while anything animates or input is recent, and drop to
+# blocking event waits capped at min_fps once idle_timeout seconds pass without either.
+DEFAULT_PACING = {"min_fps": 2, "max_fps": 30, "idle_timeout": 2.0}
+
+def load_pacing_preference():
+    pacing = dict(DEFAULT_PACING)
+    if os.path.exists(PACING_FILE):
+        with open(PACING_FILE, 'r') as f:
+            pacing.update(json.load(f))
+    return pacing
+
 def switch_theme():
     global current_theme, music_on
     if current_theme == THEME_SONG_1:
@@ -83,23 +133,109 @@ def ensure_valid_color(color):
     """Ensure the color is a valid tuple of 3 integers between 0 and 255."""
     return tuple(max(0, min(255, int(c))) for c in color)
 
+def shift_hue(color, shift):
+    """Rotate the hue of an RGB color by shift, given as a fraction of the color wheel."""
+    r, g, b = color
+    h, s, v = colorsys.rgb_to_hsv(r/255, g/255, b/255)
+    h = (h + shift) % 1.0
+    r, g, b = colorsys.hsv_to_rgb(h, s, v)
+    return ensure_valid_color((r*255, g*255, b*255))
+
+# Baked egg animation: frames are pre-rendered per (rotation step x hue step).
+# The egg turns about 3 degrees a frame, so the rotation steps stay at that size and
+# only the hue steps are scaled down until the atlas fits in EGG_ATLAS_MAX_BYTES.
+# Off by default: at the default cap only a handful of hue steps fit.
+EGG_ATLAS_ENABLED = False
+EGG_ATLAS_ROTATION_STEPS = 120
+EGG_ATLAS_HUE_STEPS = 24
+EGG_ATLAS_MAX_BYTES = 32 * 1024 * 1024
+EGG_SPOT_CLUSTERS = 5  # Each cluster is one spot plus 1-3 satellites
+
 class Spot:
     def __init__(self, x, y, z, color, size):
         self.x = x
         self.y = y
         self.z = z
         self.base_color = ensure_valid_color(color)
-        self.color = self.base_color
         self.size = size
-        self.hue_shift = 0
 
-    def update_color(self, shift):
-        self.hue_shift = (self.hue_shift + shift) % 1.0
-        r, g, b = self.base_color
-        h, s, v = colorsys.rgb_to_hsv(r/255, g/255, b/255)
-        h = (h + self.hue_shift) % 1.0
-        r, g, b = colorsys.hsv_to_rgb(h, s, v)
-        self.color = ensure_valid_color((r*255, g*255, b*255))
+def rgb_to_hsv_array(rgb):
+    """Vectorized colorsys.rgb_to_hsv over an (N, 3) array of 0-1 floats."""
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    maxc = rgb.max(axis=1)
+    minc = rgb.min(axis=1)
+    delta = maxc - minc
+    safe_delta = np.where(delta == 0, 1, delta)
+    s = np.where(maxc == 0, 0, delta / np.where(maxc == 0, 1, maxc))
+    rc = (maxc - r) / safe_delta
+    gc = (maxc - g) / safe_delta
+    bc = (maxc - b) / safe_delta
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.where(delta == 0, 0, (h / 6.0) % 1.0)
+    return np.stack([h, s, maxc], axis=1)
+
+def hsv_to_rgb_array(hsv):
+    """Vectorized colorsys.hsv_to_rgb over an (N, 3) array of 0-1 floats."""
+    h, s, v = hsv[:, 0], hsv[:, 1], hsv[:, 2]
+    i = (h * 6.0).astype(np.intp)
+    f = h * 6.0 - i
+    p = v * (1.0 - s)
+    q = v * (1.0 - s * f)
+    t = v * (1.0 - s * (1.0 - f))
+    i = i % 6
+    r = np.choose(i, [v, q, p, p, t, v])
+    g = np.choose(i, [t, v, v, q, p, p])
+    b = np.choose(i, [p, p, t, v, v, q])
+    return np.stack([r, g, b], axis=1)
+
+class SpotField:
+    """Struct-of-arrays view of the egg spots, drawn with vectorized projection and rasterization."""
+    def __init__(self, spots):
+        self.positions = np.array([(spot.x, spot.y, spot.z) for spot in spots], dtype=np.float64).reshape(-1, 3)
+        base_rgb = np.array([spot.base_color for spot in spots], dtype=np.float64).reshape(-1, 3) / 255
+        self.base_hsv = rgb_to_hsv_array(base_rgb)
+        self.sizes = np.array([spot.size for spot in spots], dtype=np.float64)
+        self.hue_offsets = np.zeros(len(spots))
+
+    def draw(self, target, rotation, hue_shift):
+        egg_width, egg_height = target.get_size()
+        angle = math.radians(rotation)
+        x, y, z = self.positions[:, 0], self.positions[:, 1], self.positions[:, 2]
+        rotated_x = x * math.cos(angle) - z * math.sin(angle)
+        rotated_z = x * math.sin(angle) + z * math.cos(angle)
+        visible = rotated_z > 0  # Back-face culling
+        if not visible.any():
+            return
+
+        center_x = (rotated_x[visible] * egg_width / 2).astype(np.intp) + egg_width // 2
+        center_y = (y[visible] * egg_height / 2).astype(np.intp) + egg_height // 2
+        sizes = self.sizes[visible]
+        spot_width = np.maximum(1, (sizes * egg_width * 0.5).astype(np.intp))
+        spot_height = np.maximum(1, (sizes * egg_height * 0.3).astype(np.intp))
+
+        hsv = self.base_hsv[visible].copy()
+        hsv[:, 0] = (hsv[:, 0] + hue_shift + self.hue_offsets[visible]) % 1.0
+        colors = np.clip((hsv_to_rgb_array(hsv) * 255).astype(np.intp), 0, 255)
+
+        # Rasterize all ellipses at once over a stamp grid sized for the largest spot
+        dx = np.arange(spot_width.max())[None, None, :]
+        dy = np.arange(spot_height.max())[None, :, None]
+        radius_x = (spot_width / 2)[:, None, None]
+        radius_y = (spot_height / 2)[:, None, None]
+        inside = ((dx + 0.5 - radius_x) / radius_x) ** 2 + ((dy + 0.5 - radius_y) / radius_y) ** 2 <= 1
+        pixel_x = (center_x - spot_width // 2)[:, None, None] + dx
+        pixel_y = (center_y - spot_height // 2)[:, None, None] + dy
+        inside &= (pixel_x >= 0) & (pixel_x < egg_width) & (pixel_y >= 0) & (pixel_y < egg_height)
+        spot_index = np.nonzero(inside)[0]  # Ascending, so later spots paint over earlier ones
+        pixel_x = np.broadcast_to(pixel_x, inside.shape)[inside]
+        pixel_y = np.broadcast_to(pixel_y, inside.shape)[inside]
+
+        pixels = pygame.surfarray.pixels3d(target)
+        pixels[pixel_x, pixel_y] = colors[spot_index]
+        del pixels
+        alpha = pygame.surfarray.pixels_alpha(target)
+        alpha[pixel_x, pixel_y] = 255
+        del alpha
 
 class EggCreature:
     def __init__(self, screen_width, screen_height, egg_width=100, egg_height=140):
@@ -115,14 +251,16 @@ class EggCreature:
         self.light_azimuth = 2.23
         self.light_elevation = -0.45
         self.spots = self.generate_spots()
+        self.spot_field = SpotField(self.spots) if np is not None else None
         self.surface = pygame.Surface((egg_width, egg_height), pygame.SRCALPHA)
         self.hue_shift = 0
         self.color_shift_speed = 0.005
+        self.atlas = None  # (rotation_steps, hue_steps, frames[hue][rotation]) once baked
 
-    def generate_spots(self):
+    def generate_spots(self, clusters=EGG_SPOT_CLUSTERS):
         spots = []
         colors = [WHITE, (255, 200, 200), (200, 255, 200), (200, 200, 255)]
-        for _ in range(5):
+        for _ in range(clusters):
             u = random.uniform(0, 1)
             v = random.uniform(0, 1)
             theta = 2 * math.pi * u
@@ -145,25 +283,24 @@ class EggCreature:
     def update(self):
         self.rotation = (self.rotation + self.rotation_speed) % 360
         self.hue_shift = (self.hue_shift + self.color_shift_speed) % 1.0
-        
-        r, g, b = self.base_color
-        h, s, v = colorsys.rgb_to_hsv(r/255, g/255, b/255)
-        h = (h + self.hue_shift) % 1.0
-        r, g, b = colorsys.hsv_to_rgb(h, s, v)
-        self.color = ensure_valid_color((r*255, g*255, b*255))
-        
-        for spot in self.spots:
-            spot.update_color(self.color_shift_speed)
+        if self.atlas is not None:
+            return  # Colors are baked into the atlas frames
 
-    def draw(self, surface):
-        self.surface.fill((0, 0, 0, 0))  # Clear the surface
+        self.color = shift_hue(self.base_color, self.hue_shift)
+
+    def render(self, target, rotation, body_color, hue_shift):
+        target.fill((0, 0, 0, 0))  # Clear the surface
         center_x, center_y = self.width // 2, self.height // 2
 
         # Draw egg shape (simplified)
-        pygame.draw.ellipse(self.surface, self.color, (0, 0, self.width, self.height))
+        pygame.draw.ellipse(target, body_color, (0, 0, self.width, self.height))
 
         # Draw spots
-        angle = math.radians(self.rotation)
+        if self.spot_field is not None:
+            self.spot_field.draw(target, rotation, hue_shift)
+            return
+
+        angle = math.radians(rotation)
         for spot in self.spots:
             rotated_x = spot.x * math.cos(angle) - spot.z * math.sin(angle)
             rotated_z = spot.x * math.sin(angle) + spot.z * math.cos(angle)
@@ -174,12 +311,58 @@ class EggCreature:
                 
                 spot_width = max(1, int(spot.size * self.width * 0.5))
                 spot_height = max(1, int(spot.size * self.height * 0.3))
-                pygame.draw.ellipse(self.surface, spot.color, 
+                pygame.draw.ellipse(target, shift_hue(spot.base_color, hue_shift), 
                                     (x - spot_width//2, y - spot_height//2, 
                                      spot_width, spot_height))
 
+    def bake_atlas(self, rotation_steps=EGG_ATLAS_ROTATION_STEPS, hue_steps=EGG_ATLAS_HUE_STEPS,
+                   max_bytes=EGG_ATLAS_MAX_BYTES, background=False):
+        """Pre-render the animation frames. Until baking finishes, draw() keeps rendering live."""
+        frame_bytes = self.width * self.height * 4
+        hue_steps = max(1, min(hue_steps, max_bytes // (rotation_steps * frame_bytes)))
+
+        def build():
+            frames = []
+            for hue_step in range(hue_steps):
+                shift = hue_step / hue_steps
+                body_color = shift_hue(self.base_color, shift)
+                row = []
+                for rotation_step in range(rotation_steps):
+                    frame = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+                    self.render(frame, rotation_step * 360 / rotation_steps, body_color, shift)
+                    row.append(frame)
+                frames.append(row)
+            self.atlas = (rotation_steps, hue_steps, frames)
+
+        if background:
+            threading.Thread(target=build, name="egg-atlas", daemon=True).start()
+        else:
+            build()
+
+    def invalidate_atlas(self):
+        """Return to live rendering, e.g. after the spots or base color change."""
+        self.atlas = None
+        self.color = shift_hue(self.base_color, self.hue_shift)
+
+    def atlas_memory(self):
+        if self.atlas is None:
+            return 0
+        rotation_steps, hue_steps, _ = self.atlas
+        return rotation_steps * hue_steps * self.width * self.height * 4
+
+    def draw(self, surface):
+        atlas = self.atlas
+        if atlas is not None:
+            rotation_steps, hue_steps, frames = atlas
+            rotation_step = int(round(self.rotation % 360 / 360 * rotation_steps)) % rotation_steps
+            hue_step = int(round(self.hue_shift * hue_steps)) % hue_steps
+            frame = frames[hue_step][rotation_step]
+        else:
+            self.render(self.surface, self.rotation, self.color, self.hue_shift)
+            frame = self.surface
+
         # Draw the pre-rendered surface onto the main surface
-        surface.blit(self.surface, (self.screen_width // 2 - self.width // 2, 
+        return surface.blit(frame, (self.screen_width // 2 - self.width // 2, 
                                     self.screen_height // 2 - self.height // 2 + self.height // 4))
                                     
 # Initialize the egg creature
@@ -201,24 +384,467 @@ def load_sound(file):
         sound = None
     return sound
 
-pick_sound = load_sound('./SOUNDS/play.mp3')
-feed_sound = load_sound('./SOUNDS/feed.mp3')
-evolve_sound = load_sound('./SOUNDS/evolve.mp3')
-spin_sound = load_sound('./SOUNDS/spin.mp3')
-win_sound = load_sound('./SOUNDS/win.mp3')
+pick_sound = feed_sound = evolve_sound = spin_sound = win_sound = None
+
+def load_sounds():
+    global pick_sound, feed_sound, evolve_sound, spin_sound, win_sound
+    pick_sound = load_sound('./SOUNDS/play.mp3')
+    feed_sound = load_sound('./SOUNDS/feed.mp3')
+    evolve_sound = load_sound('./SOUNDS/evolve.mp3')
+    spin_sound = load_sound('./SOUNDS/spin.mp3')
+    win_sound = load_sound('./SOUNDS/win.mp3')
+
+FORMULA_TOKEN = re.compile(r"([A-Z][a-z]?)(\d*)|(\(|\[)|(?:\)|\])(\d*)|(.)")
+HYDRATE_SEPARATORS = re.compile(r"[·•.*]")
+
+def parse_formula(formula):
+    """Exact element counts for a formula such as 'H2O', 'Ca(OH)2' or 'CuSO4·5H2O'.
+
+    Raises ValueError for anything that isn't a plain neutral formula.
+    """
+    counts = {}
+    for part in HYDRATE_SEPARATORS.split(formula.replace(" ", "")):
+        coefficient = part[:len(part) - len(part.lstrip("0123456789"))]
+        multiplier = int(coefficient or 1)
+        stack = [{}]
+        for symbol, subscript, opening, group_subscript, other in FORMULA_TOKEN.findall(part[len(coefficient):]):
+            if symbol:
+                if symbol not in ATOMIC_NUMBERS:
+                    raise ValueError(f"unknown element {symbol!r} in formula {formula!r}")
+                top = stack[-1]
+                top[symbol] = top.get(symbol, 0) + int(subscript or 1)
+            elif opening:
+                stack.append({})
+            elif other:
+                raise ValueError(f"unexpected {other!r} in formula {formula!r}")
+            else:
+                if len(stack) == 1:
+                    raise ValueError(f"unbalanced bracket in formula {formula!r}")
+                group = stack.pop()
+                top = stack[-1]
+                for element, count in group.items():
+                    top[element] = top.get(element, 0) + count * int(group_subscript or 1)
+        if len(stack) != 1 or not stack[0]:
+            raise ValueError(f"unbalanced or empty group in formula {formula!r}")
+        for element, count in stack[0].items():
+            counts[element] = counts.get(element, 0) + count * multiplier
+    return counts
+
+class CompoundIndex:
+    """Compounds grouped by their set of elements, with element counts and weights worked out once."""
+
+    def __init__(self, compounds):
+        self.by_signature = collections.defaultdict(list)
+        self.unparsed = []
+        start = time.perf_counter()
+        for compound in compounds:
+            if 'stoichiometry' not in compound:
+                try:
+                    compound['stoichiometry'] = parse_formula(compound['formula'])
+                except ValueError:
+                    # Fall back to one of each listed element so the compound stays craftable
+                    self.unparsed.append(compound['formula'])
+                    compound['stoichiometry'] = {element: 1 for element in compound['elements']}
+            counts = compound['stoichiometry']
+            # A match always covers every count, so its weight is just the atom total
+            self.by_signature[frozenset(counts)].append((compound, counts, sum(counts.values())))
+        self.build_ms = (time.perf_counter() - start) * 1000
+
+    def matches(self, element_counts):
+        """(compound, weight) for each compound whose elements are exactly, and sufficiently, the ones selected."""
+        candidates = self.by_signature.get(frozenset(element_counts), ())
+        return [(compound, weight) for compound, counts, weight in candidates
+                if all(element_counts[element] >= count for element, count in counts.items())]
+
+LAB_BENCH_SLOTS = 6  # Atoms the lab bench holds, and so the most one combine can use
+
+class CraftQuery:
+    """Which compounds the available elements can make, kept current one element change at a time.
+
+    Only compounds that fit on the lab bench (max_atoms atoms) are tracked,
+    since no combine can make a bigger one. Each keeps a presence bitmask
+    (bit = atomic number) and how many of its elements are short. Per
+    element, compounds are sorted by the atoms they need, so a quantity change
+    only visits compounds whose need lies between the old and new quantity.
+    """
+
+    def __init__(self, index, max_atoms=LAB_BENCH_SLOTS):
+        self.compounds = []
+        self.masks = []
+        self.short = []
+        needs = collections.defaultdict(list)
+        entries = [(compound, counts) for candidates in index.by_signature.values()
+                   for compound, counts, atoms in candidates if atoms <= max_atoms]
+        # Ids follow display order (simplest formula first), so the best hints are just the smallest ids
+        entries.sort(key=lambda entry: (len(entry[0]['formula']), entry[0]['formula']))
+        for compound_id, (compound, counts) in enumerate(entries):
+            self.compounds.append(compound)
+            self.masks.append(self.mask_of(counts))
+            self.short.append(len(counts))
+            for element, count in counts.items():
+                needs[element].append((count, compound_id))
+        self.needs = {}
+        for element, entries in needs.items():
+            entries.sort()
+            self.needs[element] = ([count for count, _ in entries], [compound_id for _, compound_id in entries])
+        self.available = {}
+        self.craftable = {i for i, short in enumerate(self.short) if short == 0}
+        self.one_away = {i for i, short in enumerate(self.short) if short == 1}
+        self.version = 0
+
+    @staticmethod
+    def mask_of(symbols):
+        mask = 0
+        for symbol in symbols:
+            mask |= 1 << ATOMIC_NUMBERS.get(symbol, 0)
+        return mask
+
+    def set_quantity(self, symbol, quantity):
+        old = self.available.get(symbol, 0)
+        if quantity == old:
+            return
+        self.available[symbol] = quantity
+        if symbol not in self.needs:
+            return
+        counts, compound_ids = self.needs[symbol]
+        # Compounds needing more than the lower quantity but no more than the higher one flip
+        low, high = min(old, quantity), max(old, quantity)
+        delta = -1 if quantity > old else 1
+        for compound_id in compound_ids[bisect.bisect_right(counts, low):bisect.bisect_right(counts, high)]:
+            before = self.short[compound_id]
+            after = self.short[compound_id] = before + delta
+            if before == 0:
+                self.craftable.discard(compound_id)
+            elif before == 1:
+                self.one_away.discard(compound_id)
+            if after == 0:
+                self.craftable.add(compound_id)
+            elif after == 1:
+                self.one_away.add(compound_id)
+        self.version += 1
+
+    def sync(self, available):
+        """Bring the query up to date with an element -> quantity mapping, touching only what changed."""
+        changed = [(symbol, quantity) for symbol, quantity in available.items() if self.available.get(symbol, 0) != quantity]
+        changed += [(symbol, 0) for symbol in self.available if symbol not in available and self.available[symbol]]
+        for symbol, quantity in changed:
+            self.set_quantity(symbol, quantity)
+
+    def _select(self, compound_ids, required_mask, limit):
+        if required_mask:
+            masks = self.masks
+            compound_ids = [i for i in compound_ids if masks[i] & required_mask == required_mask]
+        return len(compound_ids), heapq.nsmallest(limit, compound_ids)
+
+    def craftable_now(self, required_mask=0, limit=5):
+        """(total, compounds) craftable now that contain every element in required_mask, simplest first."""
+        total, best = self._select(self.craftable, required_mask, limit)
+        return total, [self.compounds[i] for i in best]
+
+    def one_element_away(self, required_mask=0, limit=5):
+        """(total, [(compound, symbol, atoms short)]) for compounds short of exactly one element."""
+        total, best = self._select(self.one_away, required_mask, limit)
+        results = []
+        for i in best:
+            compound = self.compounds[i]
+            for element, count in compound['stoichiometry'].items():
+                if self.available.get(element, 0) < count:
+                    results.append((compound, element, count - self.available.get(element, 0)))
+                    break
+        return total, results
+
+ELEMENT_ORE_COST = 1  # The purchase screen trades one ORE per element
+SYNTHESIS_CACHE_SIZE = 8
+
+class SynthesisPlanner:
+    """Cheapest ORE cost, and the steps behind it, to make each compound.
+
+    Every compound can be made from its raw elements. A compound may also list
+    extra "recipes" that use other compounds as ingredients:
+
+        "recipes": [{"compounds": {"CaO": 1, "H2O": 1}, "elements": {}, "ore": 0}]
+
+    Ingredients are referenced by name or formula. Costs are solved for all
+    compounds at once with a Dijkstra-style search over the recipe graph. A
+    recipe becomes usable only once all its ingredients are settled, so cycles
+    simply never fire. Solutions are cached per element price table.
+    """
+
+    def __init__(self, compounds):
+        self.compounds = compounds
+        self.ids = {id(compound): i for i, compound in enumerate(compounds)}
+        by_reference = {}
+        for i, compound in enumerate(compounds):
+            by_reference.setdefault(compound['formula'], i)
+        for i, compound in enumerate(compounds):
+            by_reference[compound['name']] = i
+        self.targets, self.inputs, self.elements, self.ore = [], [], [], []
+        self.users = [[] for _ in compounds]
+        self.unresolved = []
+        for i, compound in enumerate(compounds):
+            self._add_recipe(i, {}, compound['stoichiometry'], 0)
+            for recipe in compound.get('recipes', ()):
+                ingredients = {}
+                for reference, count in recipe.get('compounds', {}).items():
+                    if reference not in by_reference:
+                        self.unresolved.append((compound['name'], reference))
+                        break
+                    ingredients[by_reference[reference]] = ingredients.get(by_reference[reference], 0) + count
+                else:
+                    self._add_recipe(i, ingredients, recipe.get('elements', {}), max(0, recipe.get('ore', 0)))
+        self.solutions = {}
+        self.plans = {}
+
+    def _add_recipe(self, target, ingredients, recipe_elements, ore):
+        recipe_id = len(self.targets)
+        self.targets.append(target)
+        self.inputs.append(list(ingredients.items()))
+        self.elements.append(recipe_elements)
+        self.ore.append(ore)
+        for ingredient in ingredients:
+            self.users[ingredient].append(recipe_id)
+
+    @staticmethod
+    def _key(element_costs):
+        return None if element_costs is None else tuple(sorted(element_costs.items()))
+
+    def solve(self, element_costs=None):
+        """(cost, recipe, settle rank) per compound; unreachable compounds cost math.inf."""
+        key = self._key(element_costs)
+        if key in self.solutions:
+            return self.solutions[key]
+        if element_costs is None:
+            element_costs = {symbol: ELEMENT_ORE_COST for symbol in ATOMIC_NUMBERS}
+        count = len(self.compounds)
+        cost = [math.inf] * count
+        via = [None] * count
+        rank = [None] * count
+        settled = 0
+        base = []
+        for recipe_elements, ore in zip(self.elements, self.ore):
+            total = ore
+            for symbol, atoms in recipe_elements.items():
+                total += atoms * element_costs.get(symbol, math.inf)
+            base.append(total)
+        remaining = [len(inputs) for inputs in self.inputs]
+        heap = [(base[r], self.targets[r], r) for r in range(len(base)) if not remaining[r] and base[r] < math.inf]
+        heapq.heapify(heap)
+        while heap:
+            total, node, recipe_id = heapq.heappop(heap)
+            if rank[node] is not None:
+                continue
+            rank[node] = settled
+            settled += 1
+            cost[node] = total
+            via[node] = recipe_id
+            for user in self.users[node]:
+                remaining[user] -= 1
+                if not remaining[user] and rank[self.targets[user]] is None:
+                    total = base[user] + sum(cost[i] * atoms for i, atoms in self.inputs[user])
+                    if total < math.inf:
+                        heapq.heappush(heap, (total, self.targets[user], user))
+        if len(self.solutions) >= SYNTHESIS_CACHE_SIZE:
+            self.solutions.clear()
+            self.plans.clear()
+        self.solutions[key] = (cost, via, rank)
+        return self.solutions[key]
+
+    def reachable(self, element_costs=None):
+        """Compounds that can be made at all with the priced elements."""
+        cost = self.solve(element_costs)[0]
+        return [compound for compound, total in zip(self.compounds, cost) if total < math.inf]
+
+    def plan(self, compound, element_costs=None):
+        """(ore, steps) for the cheapest way to make compound, or None if it can't be made.
+
+        steps are (times, compound, ingredients) in the order to carry them out;
+        ingredients maps compound names and element symbols to amounts for one step.
+        """
+        cost, via, rank = self.solve(element_costs)
+        target = self.ids.get(id(compound))
+        if target is None or cost[target] == math.inf:
+            return None
+        plan_key = (self._key(element_costs), target)
+        if plan_key in self.plans:
+            return self.plans[plan_key]
+        needed = {target: 1}
+        stack = [target]
+        while stack:
+            node = stack.pop()
+            for ingredient, _ in self.inputs[via[node]]:
+                if ingredient not in needed:
+                    needed[ingredient] = 0
+                    stack.append(ingredient)
+        # Every ingredient settles before the compounds built from it
+        steps = []
+        for node in sorted(needed, key=rank.__getitem__, reverse=True):
+            recipe_id = via[node]
+            for ingredient, amount in self.inputs[recipe_id]:
+                needed[ingredient] += needed[node] * amount
+            ingredients = {self.compounds[i]['name']: amount for i, amount in self.inputs[recipe_id]}
+            ingredients.update(self.elements[recipe_id])
+            steps.append((needed[node], self.compounds[node], ingredients))
+        steps.reverse()
+        self.plans[plan_key] = (cost[target], steps)
+        return self.plans[plan_key]
+
+# Long text fields that stay on disk until a compound is shown
+LAZY_COMPOUND_FIELDS = ('description', 'trivia')
+COMPOUND_TEXT_CACHE_SIZE = 64
+COMPOUND_READ_CHUNK = 1 << 20
+JSON_WHITESPACE = re.compile(r'[\s,]*')
+
+class LazyCompound(dict):
+    """A compound record whose description and trivia are read from the file when first asked for."""
+    __slots__ = ('store', 'row')
+
+    def __missing__(self, key):
+        if key not in LAZY_COMPOUND_FIELDS or self.store.lazy_fields(self.row).get(key) is None:
+            raise KeyError(key)
+        return self.store.lazy_fields(self.row)[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+class CompoundStore:
+    """Streams a compounds.json array instead of loading it whole.
+
+    The file is read and decoded a chunk at a time and each compound object is
+    parsed on its own. Everything but the long text fields is kept on a
+    LazyCompound. Each object's byte offset and length go into one flat array,
+    so its description and trivia can be re-read from the file on demand.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.spans = array.array('q')
+        self.compounds = []
+        self.lazy_fields = functools.lru_cache(maxsize=COMPOUND_TEXT_CACHE_SIZE)(self._read_lazy_fields)
+        start = time.perf_counter()
+        with open(path, 'rb') as f:
+            self._scan(f)
+        self.scan_ms = (time.perf_counter() - start) * 1000
+
+    def _read_lazy_fields(self, row):
+        with open(self.path, 'rb') as f:
+            f.seek(self.spans[2 * row])
+            record = json.loads(f.read(self.spans[2 * row + 1]))
+        return {key: record.get(key) for key in LAZY_COMPOUND_FIELDS}
+
+    def _scan(self, f):
+        decoder = json.JSONDecoder()
+        utf8 = codecs.getincrementaldecoder('utf-8')()
+        text = ''
+        pos = 0
+        byte_pos = 0  # File offset of text[pos]
+        started = finished = eof = False
+        while not finished:
+            # Whitespace and the commas between objects are skipped, not parsed
+            gap_end = JSON_WHITESPACE.match(text, pos).end()
+            byte_pos += gap_end - pos
+            pos = gap_end
+            try:
+                if pos == len(text):
+                    raise json.JSONDecodeError("need more data", text, pos)
+                if not started:
+                    if text[pos] != '[':
+                        raise ValueError(f"{self.path}: expected a JSON array")
+                    started = True
+                    pos += 1
+                    byte_pos += 1
+                    continue
+                if text[pos] == ']':
+                    finished = True
+                    continue
+                record, end = decoder.raw_decode(text, pos)
+            except json.JSONDecodeError as error:
+                if eof:
+                    if started or text.strip():
+                        raise ValueError(f"{self.path}: {error.msg} in the compound starting at byte {byte_pos}") from error
+                    return
+                # Drop what's been parsed and read the next chunk; an object may span chunks
+                text = text[pos:]
+                pos = 0
+                chunk = f.read(COMPOUND_READ_CHUNK)
+                eof = not chunk
+                text += utf8.decode(chunk, final=eof)
+                continue
+            raw = text[pos:end]
+            length = len(raw) if raw.isascii() else len(raw.encode('utf-8'))
+            self.spans.append(byte_pos)
+            self.spans.append(length)
+            for key in LAZY_COMPOUND_FIELDS:
+                record.pop(key, None)
+            compound = LazyCompound(record)
+            compound.store = self
+            compound.row = len(self.compounds)
+            self.compounds.append(compound)
+            pos = end
+            byte_pos += length
+
+# Element and compound data, filled in by load_assets()
+elements = []
+compounds = []
+compound_index = CompoundIndex(compounds)
+craft_query = CraftQuery(compound_index)
+synthesis_planner = None  # Built by build_synthesis_planner(), or on first use by get_synthesis_planner()
+
+def get_synthesis_planner():
+    global synthesis_planner
+    if synthesis_planner is None:
+        synthesis_planner = SynthesisPlanner(compounds)
+    return synthesis_planner
+
+def build_synthesis_planner(background=False):
+    """Build the planner and solve the default prices. Until that finishes, synthesis_planner stays None."""
+    source = compounds
+
+    def build():
+        global synthesis_planner
+        planner = SynthesisPlanner(source)
+        planner.solve()
+        if compounds is source:  # Element data may have been replaced meanwhile
+            synthesis_planner = planner
+            request_full_redraw()  # Show costs on a result panel that is already up
+
+    if background:
+        threading.Thread(target=build, name="synthesis-planner", daemon=True).start()
+    else:
+        build()
+
+def set_element_data(new_elements, new_compounds):
+    """Install element and compound data and reset the per-element state derived from it."""
+    global elements, compounds, compound_index, craft_query, synthesis_planner, element_purchase_quantities, lifetime_fed
+    elements = new_elements
+    compounds = new_compounds
+    compound_index = CompoundIndex(compounds)
+    craft_query = CraftQuery(compound_index)
+    synthesis_planner = None
+
+    # Ensure each element has a color and atomic number
+    for i, element in enumerate(elements):
+        if 'color' not in element:
+            element['color'] = [random.randint(0, 255) for _ in range(3)]
+        element['atomic_number'] = i + 1
+
+    element_purchase_quantities = {element['symbol']: 0 for element in elements}
+    lifetime_fed = {element['symbol']: 0 for element in elements}
+    invalidate_periodic_table_layers()
 
 # Load JSON data
-with open('./ASSETS/elements.json', 'r') as f:
-    elements = json.load(f)
+def load_assets():
+    with open('./ASSETS/elements.json', 'r') as f:
+        loaded_elements = json.load(f)
 
-with open('./ASSETS/compounds.json', 'r') as f:
-    compounds = json.load(f)
+    store = CompoundStore('./ASSETS/compounds.json')
 
-# Ensure each element has a color and atomic number
-for i, element in enumerate(elements):
-    if 'color' not in element:
-        element['color'] = [random.randint(0, 255) for _ in range(3)]
-    element['atomic_number'] = i + 1
+    set_element_data(loaded_elements, store.compounds)
+    print(f"Scanned {len(compounds)} compounds in {store.scan_ms:.1f} ms, indexed formulas in {compound_index.build_ms:.1f} ms")
+    if compound_index.unparsed:
+        print(f"Could not parse {len(compound_index.unparsed)} formulas, e.g. {compound_index.unparsed[0]!r}")
 
 # Global variables
 current_game_name = None
@@ -231,7 +857,6 @@ purchasing_elements = False
 element_purchase_quantities = {element['symbol']: 0 for element in elements}
 feeding_elements = False
 feeding_quantities = {}
-max_spin_frames = 120
 enlarged_element = None
 selected_lab_elements = []
 combination_result = None
@@ -260,18 +885,29 @@ max_growth = 50
 # Slot machine state
 playing_slot_machine = False
 spinning = False
-spin_frames = 0
-spin_slowdown = 1
+spin_elapsed = 0.0
 
 reels = [['💎', '💰', '💵'] for _ in range(3)]
-reel_results = [['', '', ''] for _ in range(3)]
 reel_positions = [0, 0, 0]
+reel_results = [[reels[i][j] for i in range(3)] for j in range(3)]
+
+# Reel physics, in seconds and symbols. Reel i stops at SPIN_DURATION - i * SPIN_STAGGER,
+# following a trapezoidal velocity profile: accelerate, cruise, then ease into the stop.
+SPIN_DURATION = 4.0
+SPIN_STAGGER = 2 / 3
+SPIN_ACCELERATION_TIME = 0.4
+SPIN_DECELERATION_TIME = 1.2
+SPIN_CRUISE_SPEED = 12.0  # Symbols per second
+REEL_SYMBOL_SPACING = 125
+reel_offsets = [0.0, 0.0, 0.0]  # Fractional symbol index shown in each reel's top row
+reel_spin_plans = []  # (start_offset, distance, stop_time, cruise_speed) per reel
+reel_strips = None
 
 payouts = {'💎': 100, '💰': 75, '💵': 50}
 
 # UI elements
 font_path = "C:/Windows/Fonts/seguiemj.ttf"
-slot_font = pygame.font.Font(font_path, 48)
+slot_font = get_font(48, font_path)
 
 buttons = [
     {"label": "PICK", "rect": pygame.Rect(750, height // 2 - 120, 100, 50), "color": (0, 255, 0)},
@@ -286,7 +922,6 @@ spin_button = pygame.Rect(325, 675, 150, 60)
 back_button = pygame.Rect(50, 675, 150, 60)
 
 music_on, current_theme = load_music_preference()
-start_theme_song()
 
 def ensure_valid_color(color):
     """Ensure the color is a valid tuple of 3 integers between 0 and 255."""
@@ -298,30 +933,232 @@ def draw_buttons():
         pygame.draw.rect(screen, button["color"], button["rect"])
         pygame.draw.line(screen, (255, 255, 255), (button["rect"].x, button["rect"].y), (button["rect"].x + button["rect"].width, button["rect"].y), 2)
         pygame.draw.line(screen, (255, 255, 255), (button["rect"].x, button["rect"].y), (button["rect"].x, button["rect"].y + button["rect"].height), 2)
-        text = debug_font.render(button["label"], True, (0, 0, 0))
+        text = render_text(debug_font, button["label"], (0, 0, 0))
         text_rect = text.get_rect(center=button["rect"].center)
         screen.blit(text, text_rect)
         # Draw button coordinates
         # coord_text = font.render(f"{button['rect'].x}, {button['rect'].y}", True, (255, 255, 255))
         # screen.blit(coord_text, (button["rect"].x, button["rect"].y - 20))
 
+# Dirty-rectangle display updates: screens redraw the back buffer every frame but
+# only the regions they mark are pushed to the display, unless a full flip is due.
+FULL_REDRAW_EVENTS = (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEWHEEL, pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)
+debug_overlay_rect = None  # Area the debug overlay covered last frame
+dirty_rects = []
+full_redraw = True
+
+def mark_dirty(rect):
+    dirty_rects.append(pygame.Rect(rect))
+
+def request_full_redraw():
+    global full_redraw
+    full_redraw = True
+
+def present_frame():
+    global full_redraw
+    if full_redraw:
+        pygame.display.flip()
+        full_redraw = False
+    elif dirty_rects:
+        pygame.display.update(dirty_rects)
+    dirty_rects.clear()
+
+# Timed notifications (wins, level-ups, hatching) composited over whichever screen is up.
+# Messages queue and play one at a time: scale and fade in, hold, then fade out.
+OVERLAY_FADE_TIME = 0.3
+OVERLAY_START_SCALE = 0.5
+
+class OverlayScheduler:
+    def __init__(self):
+        self.queue = collections.deque()
+        self.active = None  # [text, color, size, duration, elapsed]
+        self.last_rect = None
+
+    def push(self, text, color=(255, 255, 0), size=72, duration=2.0):
+        self.queue.append([text, color, size, duration, 0.0])
+
+    def busy(self):
+        return self.active is not None or bool(self.queue)
+
+    def clear(self):
+        self.queue.clear()
+        self.active = None
+
+    def update(self, dt):
+        if self.active is None and self.queue:
+            self.active = self.queue.popleft()
+        elif self.active is not None:
+            self.active[4] += dt
+            if self.active[4] >= self.active[3]:
+                self.active = self.queue.popleft() if self.queue else None
+
+    def draw(self, target):
+        """Composite the current message and return the rects that changed since last frame."""
+        changed = [self.last_rect] if self.last_rect else []
+        self.last_rect = None
+        if self.active is None:
+            return changed
+        text, color, size, duration, elapsed = self.active
+        fade_in = min(1.0, elapsed / OVERLAY_FADE_TIME)
+        fade_out = min(1.0, (duration - elapsed) / OVERLAY_FADE_TIME)
+        ease = 1 - (1 - fade_in) ** 3  # Ease-out cubic
+        surface = render_text(get_font(size), text, color)
+        if ease < 1:
+            scale = OVERLAY_START_SCALE + (1 - OVERLAY_START_SCALE) * ease
+            surface = pygame.transform.smoothscale(surface, (max(1, int(surface.get_width() * scale)), max(1, int(surface.get_height() * scale))))
+        alpha = int(255 * max(0.0, min(fade_in, fade_out)))
+        if alpha < 255:
+            surface = surface.copy() if ease >= 1 else surface  # Never tint the cached text surface
+            surface.set_alpha(alpha)
+        rect = target.blit(surface, surface.get_rect(center=(width // 2, height // 2)))
+        self.last_rect = rect
+        changed.append(rect)
+        return changed
+
+overlays = OverlayScheduler()
+
+# Per-phase frame profiler shown in the F3 overlay; F4 dumps recent frames to JSONL
+PROFILER_HISTORY_FRAMES = 600  # Twenty seconds at 30 FPS
+PROFILER_DUMP_SECONDS = 10
+PROFILER_GRAPH_MAX_MS = 100
+PROFILER_PHASE_COLORS = {
+    "events": (100, 200, 255),
+    "egg_update": (255, 200, 0),
+    "draw": (0, 220, 120),
+    "autosave": (255, 80, 80),
+    "flip": (200, 120, 255),
+}
+
+class FrameProfiler:
+    def __init__(self, capacity=PROFILER_HISTORY_FRAMES):
+        self.frames = collections.deque(maxlen=capacity)  # (wall time, {phase: ms}) per frame
+        self.current = {}
+        self.frame_time = time.time()
+        self.last_mark = time.perf_counter()
+
+    def begin_frame(self):
+        self.current = {}
+        self.frame_time = time.time()
+        self.last_mark = time.perf_counter()
+
+    def mark(self, phase):
+        """Charge the time since the previous mark to phase."""
+        now = time.perf_counter()
+        self.current[phase] = self.current.get(phase, 0) + (now - self.last_mark) * 1000
+        self.last_mark = now
+
+    def end_frame(self):
+        self.frames.append((self.frame_time, self.current))
+
+    def duty_cycle(self, frame_count):
+        """Fraction of wall time spent working rather than waiting, over the last frame_count frames."""
+        recent = list(self.frames)[-frame_count:]
+        if len(recent) < 2:
+            return 1.0
+        elapsed = recent[-1][0] - recent[0][0]
+        work = sum(sum(phases.values()) for _, phases in recent[:-1]) / 1000
+        return min(1.0, work / elapsed) if elapsed > 0 else 1.0
+
+    def phase_stats(self, frame_count):
+        recent = list(self.frames)[-frame_count:]
+        stats = {}
+        for phase in PROFILER_PHASE_COLORS:
+            samples = [phases.get(phase, 0) for _, phases in recent] or [0]
+            stats[phase] = (sum(samples) / len(samples), max(samples))
+        return stats
+
+    def dump(self, path, seconds=PROFILER_DUMP_SECONDS):
+        cutoff = time.time() - seconds
+        with open(path, "w") as f:
+            for frame_time, phases in self.frames:
+                if frame_time >= cutoff:
+                    record = {"time": frame_time, "total_ms": round(sum(phases.values()), 3)}
+                    record.update({phase: round(ms, 3) for phase, ms in phases.items()})
+                    f.write(json.dumps(record) + "\n")
+        return path
+
+frame_profiler = FrameProfiler()
+
+def dump_frame_timings():
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = frame_profiler.dump(f"frame_timings_{timestamp}.jsonl")
+    print(f"Frame timings written to {path}")
+
+def draw_frame_profile(top):
+    """Draw the phase timings and frame graph. Returns the rects drawn."""
+    graph = pygame.Rect(width - 310, top + 5 * 22 + 5, 300, 80)
+    stats = frame_profiler.phase_stats(graph.width // 2)
+    drawn = []
+    for i, (phase, (average, worst)) in enumerate(stats.items()):
+        text = debug_font.render(f"{phase}: avg {average:.2f} ms, max {worst:.2f} ms", True, PROFILER_PHASE_COLORS[phase])
+        drawn.append(screen.blit(text, (width - text.get_width() - 10, top + i * 22)))
+
+    # Stacked bar per frame, newest on the right, with the 30 FPS budget as a guide line
+    drawn.append(pygame.draw.rect(screen, (20, 20, 20), graph))
+    px_per_ms = graph.height / PROFILER_GRAPH_MAX_MS
+    recent = list(frame_profiler.frames)[-(graph.width // 2):]
+    worst_index, worst_total = None, 0
+    for i, (_, phases) in enumerate(recent):
+        x = graph.right - (len(recent) - i) * 2
+        y = graph.bottom
+        for phase, color in PROFILER_PHASE_COLORS.items():
+            bar_height = min(y - graph.top, int(phases.get(phase, 0) * px_per_ms))
+            if bar_height > 0:
+                pygame.draw.rect(screen, color, (x, y - bar_height, 2, bar_height))
+                y -= bar_height
+        total = sum(phases.values())
+        if total > worst_total:
+            worst_index, worst_total = i, total
+    budget_y = graph.bottom - int(1000 / 30 * px_per_ms)
+    pygame.draw.line(screen, (120, 120, 120), (graph.left, budget_y), (graph.right, budget_y))
+    if worst_index is not None:
+        worst_x = graph.right - (len(recent) - worst_index) * 2
+        pygame.draw.line(screen, (255, 0, 0), (worst_x, graph.top), (worst_x, graph.bottom))
+        worst_phase = max(recent[worst_index][1].items(), key=lambda item: item[1])[0]
+        worst_text = debug_font.render(f"Worst frame: {worst_total:.1f} ms ({worst_phase})", True, (255, 0, 0))
+        drawn.append(screen.blit(worst_text, (width - worst_text.get_width() - 10, graph.bottom + 5)))
+
+    pacing_mode = f"idle ({pacing['min_fps']} FPS cap)" if pacing_idle else f"active ({pacing['max_fps']} FPS)"
+    pacing_text = debug_font.render(f"Pacing: {pacing_mode}, duty cycle {frame_profiler.duty_cycle(graph.width // 2):.1%}", True, (255, 255, 255))
+    drawn.append(screen.blit(pacing_text, (width - pacing_text.get_width() - 10, graph.bottom + 30)))
+    return drawn
+
 def draw_debug_overlay(fps):
+    global debug_overlay_rect
     if debug_mode:
+        # Overlay text changes every frame, so render it directly instead of churning the cache
         fps_text = debug_font.render(f"FPS: {fps:.2f}", True, (255, 255, 255))
-        screen.blit(fps_text, (width - 100, 10))
+        drawn = [screen.blit(fps_text, (width - 100, 10))]
+        cache_info = _render_text_cached.cache_info()
+        cache_text = debug_font.render(f"Text cache: {cache_info.hits} hits / {cache_info.misses} misses ({cache_info.currsize}/{cache_info.maxsize}), fonts: {len(_font_registry)}", True, (255, 255, 255))
+        drawn.append(screen.blit(cache_text, (width - cache_text.get_width() - 10, 35)))
+        if egg_creature.atlas is not None:
+            rotation_steps, hue_steps, _ = egg_creature.atlas
+            atlas_label = f"Egg atlas: {rotation_steps}x{hue_steps} frames, {egg_creature.atlas_memory() / (1024 * 1024):.1f} MB"
+        else:
+            atlas_label = "Egg atlas: live rendering"
+        atlas_text = debug_font.render(atlas_label, True, (255, 255, 255))
+        drawn.append(screen.blit(atlas_text, (width - atlas_text.get_width() - 10, 60)))
+        autosave_text = debug_font.render(f"Autosaves: {autosave_stats['written']} written / {autosave_stats['skipped']} skipped", True, (255, 255, 255))
+        drawn.append(screen.blit(autosave_text, (width - autosave_text.get_width() - 10, 85)))
+        drawn.extend(draw_frame_profile(110))
+        # Also repaint last frame's area, in case a line got shorter
+        area = drawn[0].unionall(drawn[1:])
+        mark_dirty(area if debug_overlay_rect is None else area.union(debug_overlay_rect))
+        debug_overlay_rect = area
 
 def draw_title_screen():
     screen.fill((0, 0, 0))
     
-    egg_creature.draw(screen)
+    mark_dirty(egg_creature.draw(screen))
     
-    font = pygame.font.Font(None, 72)
-    title_text = font.render("ELEMENT EGG", True, (255, 255, 255))
+    font = get_font(72)
+    title_text = render_text(font, "ELEMENT EGG", (255, 255, 255))
     title_rect = title_text.get_rect(center=(width // 2, height // 4))
     screen.blit(title_text, title_rect)
     
-    tagline_font = pygame.font.Font(None, 36)
-    tagline_text = tagline_font.render("Hatch your ultimate power!", True, (255, 255, 255))
+    tagline_font = get_font(36)
+    tagline_text = render_text(tagline_font, "Hatch your ultimate power!", (255, 255, 255))
     tagline_rect = tagline_text.get_rect(center=(width // 2, height // 4 + 60))
     screen.blit(tagline_text, tagline_rect)
     
@@ -332,39 +1169,137 @@ def draw_title_screen():
     pygame.draw.line(screen, (255, 255, 255), (start_button["rect"].x, start_button["rect"].y), (start_button["rect"].x + start_button["rect"].width, start_button["rect"].y), 2)
     pygame.draw.line(screen, (255, 255, 255), (start_button["rect"].x, start_button["rect"].y), (start_button["rect"].x, start_button["rect"].y + start_button["rect"].height), 2)
     
-    button_font = pygame.font.Font(None, 36)
-    button_text = button_font.render(start_button["label"], True, (0, 0, 0))
+    button_font = get_font(36)
+    button_text = render_text(button_font, start_button["label"], (0, 0, 0))
     button_text_rect = button_text.get_rect(center=start_button["rect"].center)
     screen.blit(button_text, button_text_rect)
 
+class TableLayout:
+    """Tile geometry for one periodic table configuration, shared by drawing and hit-testing."""
+    columns = 18
+
+    def __init__(self, scale, x_start, y_offset):
+        self.scale = scale
+        self.element_size = int(40 * scale)
+        self.pitch = self.element_size + 5 * scale
+        self.x_start = x_start
+        self.y_offset = y_offset
+
+    @classmethod
+    def centered(cls, scale, y_offset):
+        element_size = int(40 * scale)
+        table_width = cls.columns * element_size + (cls.columns - 1) * 5 * scale
+        return cls(scale, (width - table_width) // 2, y_offset)
+
+    def tile_rect(self, index):
+        x = int(self.x_start + (index % self.columns) * self.pitch)
+        y = int(self.y_offset + (index // self.columns) * self.pitch)
+        return pygame.Rect(x, y, self.element_size, self.element_size)
+
+    def index_at(self, x, y):
+        """Return the element index under (x, y), or None for gaps and empty space."""
+        column = int((x - self.x_start) // self.pitch)
+        row = int((y - self.y_offset) // self.pitch)
+        # Tile origins are truncated to whole pixels, so a point can sit one cell beyond the arithmetic guess
+        for r in (row, row + 1):
+            for c in (column, column + 1):
+                if 0 <= c < self.columns and r >= 0:
+                    index = r * self.columns + c
+                    if index < len(elements) and self.tile_rect(index).collidepoint(x, y):
+                        return index
+        return None
+
+    def element_at(self, x, y):
+        index = self.index_at(x, y)
+        return None if index is None else elements[index]
+
+SELECTION_TABLE_LAYOUT = TableLayout(1, 50, 50)
+LAB_TABLE_LAYOUT = TableLayout.centered(0.9, 100)
+
+# Pre-rendered periodic table layers, keyed by (layout, highlighted symbols)
+MAX_PERIODIC_TABLE_LAYERS = 16
+_periodic_table_layers = {}
+
+def invalidate_periodic_table_layers():
+    """Drop every cached table layer. Call this whenever element colors change."""
+    _periodic_table_layers.clear()
+
+def render_periodic_table_layer(layout, highlighted):
+    origin_x, origin_y = int(layout.x_start), int(layout.y_offset)
+    rows = max(1, (len(elements) + layout.columns - 1) // layout.columns)
+    corner = layout.tile_rect(rows * layout.columns - 1)
+    layer = pygame.Surface((corner.right - origin_x, corner.bottom - origin_y), pygame.SRCALPHA)
+
+    font = get_font(int(18 * layout.scale))
+    for i, element in enumerate(elements):
+        tile = layout.tile_rect(i).move(-origin_x, -origin_y)
+        x, y = tile.topleft
+        rect_color = element["color"] if "color" in element else [100, 100, 100]
+        pygame.draw.rect(layer, rect_color, tile)
+        text = render_text(font, element["symbol"], (255, 255, 255) if rect_color == [0, 0, 0] else (0, 0, 0))
+        layer.blit(text, (x + 5, y + 5))
+        atomic_number_text = render_text(font, str(element["atomic_number"]), (255, 255, 255))
+        layer.blit(atomic_number_text, (x + 5, y + int(20 * layout.scale)))
+        if element["symbol"] in highlighted:
+            pygame.draw.rect(layer, WHITE, tile, 2)
+    return layer
+
+def draw_periodic_table_layer(layout, highlighted=frozenset()):
+    """Blit the table in one operation, rasterizing it only when this configuration is new."""
+    key = (layout, highlighted)
+    layer = _periodic_table_layers.get(key)
+    if layer is None:
+        if len(_periodic_table_layers) >= MAX_PERIODIC_TABLE_LAYERS:
+            _periodic_table_layers.clear()
+        layer = render_periodic_table_layer(layout, highlighted)
+        _periodic_table_layers[key] = layer
+    screen.blit(layer, (int(layout.x_start), int(layout.y_offset)))
+
+# Hover tooltip: (layout, element index) under the mouse, or None
+hovered_tile = None
+
+def update_hovered_tile(pos):
+    """Hit-test the mouse against the current screen's table and redraw only when the hovered tile changes."""
+    global hovered_tile
+    layout = {"element_selection": SELECTION_TABLE_LAYOUT, "lab": LAB_TABLE_LAYOUT}.get(current_screen)
+    index = layout.index_at(*pos) if layout else None
+    tile = None if index is None else (layout, index)
+    if tile != hovered_tile:
+        hovered_tile = tile
+        request_full_redraw()
+
+def draw_element_tooltip(layout):
+    if not hovered_tile or hovered_tile[0] is not layout:
+        return
+    element = elements[hovered_tile[1]]
+    tile = layout.tile_rect(hovered_tile[1])
+    text = render_text(get_font(22), f"{element['name']} ({element['atomic_weight']})", (255, 255, 255))
+    box = text.get_rect().inflate(12, 8)
+    box.midtop = (tile.centerx, tile.bottom + 4)
+    box.clamp_ip(screen.get_rect())
+    pygame.draw.rect(screen, (20, 20, 20), box)
+    pygame.draw.rect(screen, WHITE, box, 1)
+    screen.blit(text, text.get_rect(center=box.center))
+
 # Draw periodic table
 def draw_periodic_table():
-    global enlarged_element
-    element_size = 40
-    for i, element in enumerate(elements):
-        x = 50 + (i % 18) * (element_size + 5)
-        y = 50 + (i // 18) * (element_size + 5)  # Adjusted position
+    draw_periodic_table_layer(SELECTION_TABLE_LAYOUT, frozenset(e["symbol"] for e in selected_elements))
+
+    if enlarged_element:
+        element = enlarged_element
         rect_color = element["color"] if "color" in element else [100, 100, 100]
-        pygame.draw.rect(screen, rect_color, (x, y, element_size, element_size))
-        font = pygame.font.Font(None, 18)
-        text = font.render(element["symbol"], True, (255, 255, 255) if rect_color == [0, 0, 0] else (0, 0, 0))
-        screen.blit(text, (x + 5, y + 5))
-        atomic_number_text = font.render(str(element["atomic_number"]), True, (255, 255, 255))
-        screen.blit(atomic_number_text, (x + 5, y + 20))
-        
-        if enlarged_element and enlarged_element['symbol'] == element['symbol']:
-            enlarged_rect = pygame.Rect(50, height - 350, 300, 300)  # Bottom-left corner
-            pygame.draw.rect(screen, rect_color, enlarged_rect)
-            large_font = pygame.font.Font(None, 72)
-            large_text = large_font.render(element["symbol"], True, (255, 255, 255))
-            large_text_rect = large_text.get_rect(center=(enlarged_rect.centerx, enlarged_rect.y + 80))
-            screen.blit(large_text, large_text_rect)
-            name_text = pygame.font.Font(None, 36).render(element["name"], True, (255, 255, 255))
-            screen.blit(name_text, (enlarged_rect.x + 10, enlarged_rect.y + 120))
-            atomic_text = pygame.font.Font(None, 36).render(f"Atomic Number: {element['atomic_number']}", True, (255, 255, 255))
-            screen.blit(atomic_text, (enlarged_rect.x + 10, enlarged_rect.y + 160))
-            weight_text = pygame.font.Font(None, 36).render(f"Atomic Weight: {element['atomic_weight']}", True, (255, 255, 255))
-            screen.blit(weight_text, (enlarged_rect.x + 10, enlarged_rect.y + 200))
+        enlarged_rect = pygame.Rect(50, height - 350, 300, 300)  # Bottom-left corner
+        pygame.draw.rect(screen, rect_color, enlarged_rect)
+        large_font = get_font(72)
+        large_text = render_text(large_font, element["symbol"], (255, 255, 255))
+        large_text_rect = large_text.get_rect(center=(enlarged_rect.centerx, enlarged_rect.y + 80))
+        screen.blit(large_text, large_text_rect)
+        name_text = render_text(get_font(36), element["name"], (255, 255, 255))
+        screen.blit(name_text, (enlarged_rect.x + 10, enlarged_rect.y + 120))
+        atomic_text = render_text(get_font(36), f"Atomic Number: {element['atomic_number']}", (255, 255, 255))
+        screen.blit(atomic_text, (enlarged_rect.x + 10, enlarged_rect.y + 160))
+        weight_text = render_text(get_font(36), f"Atomic Weight: {element['atomic_weight']}", (255, 255, 255))
+        screen.blit(weight_text, (enlarged_rect.x + 10, enlarged_rect.y + 200))
 
 def create_new_game():
     global current_screen, ore_chunks, selected_elements, element_quantities, egg_level, growth_level, tokens, current_game_name
@@ -385,10 +1320,10 @@ def draw_selected_elements():
         y = height - 350 + i * 100
         rect_color = element["color"] if "color" in element else [100, 100, 100]
         pygame.draw.rect(screen, rect_color, (x, y, 80, 80))
-        font = pygame.font.Font(None, 24)
-        text = font.render(element["symbol"], True, (255, 255, 255) if rect_color == [0, 0, 0] else (0, 0, 0))
+        font = get_font(24)
+        text = render_text(font, element["symbol"], (255, 255, 255) if rect_color == [0, 0, 0] else (0, 0, 0))
         screen.blit(text, (x + 10, y + 10))
-        text = font.render(element["name"], True, (255, 255, 255))
+        text = render_text(font, element["name"], (255, 255, 255))
         screen.blit(text, (x + 90, y + 40))
 
 # Draw growth meter
@@ -396,8 +1331,8 @@ def draw_growth_meter():
     pygame.draw.rect(screen, (255, 255, 255), pygame.Rect(750, 450, 100, 30))
     fill_width = int(100 * (growth_level / max_growth))
     pygame.draw.rect(screen, (0, 255, 0), pygame.Rect(750, 450, fill_width, 30))
-    font = pygame.font.Font(None, 24)
-    text = font.render(f"Growth: {growth_level}/{max_growth}", True, (0, 0, 0))
+    font = get_font(24)
+    text = render_text(font, f"Growth: {growth_level}/{max_growth}", (0, 0, 0))
     screen.blit(text, (750, 420))
 
 # Draw ORE meter
@@ -405,8 +1340,8 @@ def draw_ore_meter():
     pygame.draw.rect(screen, (0, 0, 0), pygame.Rect(750, 450, 100, 30))
     fill_width = int(100 * (ore_chunks / 9999))
     pygame.draw.rect(screen, (0, 255, 0), pygame.Rect(750, 450, fill_width, 30))
-    font = pygame.font.Font(None, 24)
-    text = font.render(f"ORE: {ore_chunks}/9999", True, (255, 255, 255))
+    font = get_font(24)
+    text = render_text(font, f"ORE: {ore_chunks}/9999", (255, 255, 255))
     screen.blit(text, (750, 420))
 
 # Updated draw_slot_machine function
@@ -421,42 +1356,41 @@ def draw_slot_machine(first_time=False):
     reel_width = 240
     reel_height = 400
     reel_spacing = (780 - 3 * reel_width) // 2  # Adjust spacing between reels
-    for i in range(3):
-        x = 60 + i * (reel_width + reel_spacing)
-        pygame.draw.rect(screen, (200, 200, 200), (x, 100, reel_width, reel_height))
-    
     if first_time:
         # Show a "loss" state for new games
+        for i in range(3):
+            x = 60 + i * (reel_width + reel_spacing)
+            pygame.draw.rect(screen, (200, 200, 200), (x, 100, reel_width, reel_height))
         for i in range(3):
             for j in range(3):
-                text = slot_font.render("X", True, (0, 0, 0))
+                text = render_text(slot_font, "X", (0, 0, 0))
                 text_rect = text.get_rect(center=(60 + i * (reel_width + reel_spacing) + reel_width // 2, 150 + j * 150))
                 screen.blit(text, text_rect)
     else:
+        strips = get_reel_strips(reel_width, reel_height)
         for i in range(3):
-            for j in range(3):
-                text = slot_font.render(reel_results[j][i], True, (0, 0, 0))
-                text_rect = text.get_rect(center=(60 + i * (reel_width + reel_spacing) + reel_width // 2, 150 + j * 125))  # Adjust vertical positioning
-                screen.blit(text, text_rect)
+            x = 60 + i * (reel_width + reel_spacing)
+            scroll = (reel_offsets[i] % len(reels[i])) * REEL_SYMBOL_SPACING
+            screen.blit(strips[i], (x, 100), pygame.Rect(0, round(scroll), reel_width, reel_height))
     
     # Draw SPIN button
     pygame.draw.rect(screen, (255, 0, 0), (325, 675, 150, 60))
-    spin_text = slot_font.render("SPIN", True, (255, 255, 255))
+    spin_text = render_text(slot_font, "SPIN", (255, 255, 255))
     spin_rect = spin_text.get_rect(center=(400, 705))
     screen.blit(spin_text, spin_rect)
     
     # Draw Back button
     pygame.draw.rect(screen, (0, 0, 255), (50, 675, 150, 60))
-    back_text = slot_font.render("BACK", True, (255, 255, 255))
+    back_text = render_text(slot_font, "BACK", (255, 255, 255))
     back_rect = back_text.get_rect(center=(125, 705))
     screen.blit(back_text, back_rect)
 
     # Draw token count
-    token_text = slot_font.render(f"Tokens: {tokens}", True, (255, 255, 255))
+    token_text = render_text(slot_font, f"Tokens: {tokens}", (255, 255, 255))
     screen.blit(token_text, (600, 675))
 
     # Draw total ORE count
-    ore_text = slot_font.render(f"ORE: {ore_chunks}", True, (255, 255, 255))
+    ore_text = render_text(slot_font, f"ORE: {ore_chunks}", (255, 255, 255))
     screen.blit(ore_text, (600, 725))
 
 def draw_selected_ores():
@@ -465,23 +1399,23 @@ def draw_selected_ores():
         y = 50
         rect_color = element["color"] if "color" in element else [100, 100, 100]
         pygame.draw.rect(screen, rect_color, (x, y, 80, 80))
-        font = pygame.font.Font(None, 36)
-        text = font.render(element["symbol"], True, (255, 255, 255) if rect_color == [0, 0, 0] else (0, 0, 0))
+        font = get_font(36)
+        text = render_text(font, element["symbol"], (255, 255, 255) if rect_color == [0, 0, 0] else (0, 0, 0))
         screen.blit(text, (x + 20, y + 20))
-        quantity_text = font.render(f"{element_quantities[element['symbol']]}", True, (255, 255, 255))
+        quantity_text = render_text(font, f"{element_quantities[element['symbol']]}", (255, 255, 255))
         screen.blit(quantity_text, (x + 20, y + 100))  # Display quantity below the tile
 
 def draw_lab_screen():
     global combination_result, screen, selected_lab_elements
     screen.fill((50, 50, 50))  # Dark gray background
-    font = pygame.font.Font(None, 36)
+    font = get_font(36)
     
     # Draw LABORATORY title
-    title = font.render("LABORATORY", True, (255, 255, 255))
+    title = render_text(font, "LABORATORY", (255, 255, 255))
     screen.blit(title, (width // 2 - 100, 50))
 
     # Draw periodic table
-    draw_lab_periodic_table(scale=0.9, y_offset=100)
+    draw_lab_periodic_table(highlighted=frozenset(e["symbol"] for e in selected_lab_elements))
 
     # Calculate the bottom of the periodic table
     table_bottom = 100 + (7 * (int(40 * 0.9) + int(5 * 0.9)))  # y_offset + (7 rows * (element_size + gap))
@@ -493,67 +1427,89 @@ def draw_lab_screen():
 
     # Draw selected elements
     slot_size = 60
-    for i in range(6):
+    for i in range(LAB_BENCH_SLOTS):
         slot_x = width // 2 - 180 + i * 70
         slot_y = height - 150
         pygame.draw.rect(screen, (100, 100, 100), (slot_x, slot_y, slot_size, slot_size))
         if i < len(selected_lab_elements):
             element = selected_lab_elements[i]
             pygame.draw.rect(screen, element["color"], (slot_x, slot_y, slot_size, slot_size))
-            text = font.render(element['symbol'], True, (255, 255, 255))
+            text = render_text(font, element['symbol'], (255, 255, 255))
             text_rect = text.get_rect(center=(slot_x + slot_size // 2, slot_y + slot_size // 2))
             screen.blit(text, text_rect)
 
     # Draw COMBINE button
     combine_button = pygame.Rect(50, height - 80, 120, 60)
     pygame.draw.rect(screen, (0, 255, 0), combine_button)
-    combine_text = font.render("COMBINE", True, (0, 0, 0))
+    combine_text = render_text(font, "COMBINE", (0, 0, 0))
     combine_text_rect = combine_text.get_rect(center=combine_button.center)
     screen.blit(combine_text, combine_text_rect)
 
     # Draw BACK button
     back_button = pygame.Rect(180, height - 80, 100, 60)
     pygame.draw.rect(screen, (255, 0, 0), back_button)
-    back_text = font.render("Back", True, (0, 0, 0))
+    back_text = render_text(font, "Back", (0, 0, 0))
     back_text_rect = back_text.get_rect(center=back_button.center)
     screen.blit(back_text, back_text_rect)
 
     # Draw token count
-    token_text = font.render(f"Tokens: {tokens}", True, (255, 255, 255))
+    token_text = render_text(font, f"Tokens: {tokens}", (255, 255, 255))
     screen.blit(token_text, (width - 200, 50))
 
     # Draw combination results
     if combination_result:
         draw_combination_result(combination_result, 3 * width // 4 - 150, table_bottom + 20)  # Moved towards center
-
-    pygame.display.flip()
-    
-def draw_lab_periodic_table(scale=0.9, y_offset=100):
-    element_size = int(40 * scale)
-    font_size = int(18 * scale)
-    table_width = 18 * element_size + 17 * 5 * scale  # 18 elements wide, 17 gaps
-    x_start = (width - table_width) // 2  # Center the table
-
-    for i, element in enumerate(elements):
-        x = int(x_start + (i % 18) * (element_size + 5 * scale))
-        y = int(y_offset + (i // 18) * (element_size + 5 * scale))
-        rect_color = element["color"] if "color" in element else [100, 100, 100]
-        pygame.draw.rect(screen, rect_color, (x, y, element_size, element_size))
-        font = pygame.font.Font(None, font_size)
-        text = font.render(element["symbol"], True, (255, 255, 255) if rect_color == [0, 0, 0] else (0, 0, 0))
-        screen.blit(text, (x + 5, y + 5))
-        atomic_number_text = font.render(str(element["atomic_number"]), True, (255, 255, 255))
-        screen.blit(atomic_number_text, (x + 5, y + int(20 * scale)))
+    draw_lab_hints(width // 2 - 70, table_bottom + 20)
+    draw_element_tooltip(LAB_TABLE_LAYOUT)
+    
+LAB_HINT_ROWS = 4
+lab_hint_panel = None  # (key, surface) for the last rendered hint panel
+
+def render_lab_hints(required_mask, panel_width, panel_height):
+    panel = pygame.Surface((panel_width, panel_height))
+    panel.fill((30, 30, 30))
+    pygame.draw.rect(panel, (120, 120, 120), panel.get_rect(), 1)
+    font = get_font(20)
+    y = 6
+    total, craftable = craft_query.craftable_now(required_mask, LAB_HINT_ROWS)
+    panel.blit(render_text(font, f"CAN MAKE: {total}", (255, 255, 0)), (8, y))
+    for compound in craftable:
+        y += 20
+        panel.blit(render_text(font, compound['formula'], (255, 255, 255)), (14, y))
+    y = panel_height // 2 + 6
+    total, near = craft_query.one_element_away(required_mask, LAB_HINT_ROWS)
+    panel.blit(render_text(font, f"1 AWAY: {total}", (255, 165, 0)), (8, y))
+    for compound, symbol, atoms in near:
+        y += 20
+        panel.blit(render_text(font, f"{compound['formula']} +{atoms}{symbol}", (200, 200, 200)), (14, y))
+    return panel
+
+def draw_lab_hints(x, y, panel_width=140, panel_height=225):
+    """Hint panel of compounds the inventory plus the bench can make, or nearly make."""
+    global lab_hint_panel
+    available = collections.Counter(element_quantities)
+    for element in selected_lab_elements:
+        available[element['symbol']] += 1
+    craft_query.sync(available)
+    required_mask = craft_query.mask_of(element['symbol'] for element in selected_lab_elements)
+    # Only re-query and re-render when the inventory or bench actually changed
+    key = (craft_query, craft_query.version, required_mask)
+    if lab_hint_panel is None or lab_hint_panel[0] != key:
+        lab_hint_panel = (key, render_lab_hints(required_mask, panel_width, panel_height))
+    screen.blit(lab_hint_panel[1], (x, y))
+
+def draw_lab_periodic_table(highlighted=frozenset()):
+    draw_periodic_table_layer(LAB_TABLE_LAYOUT, highlighted)
 
 def draw_element_details(element, x, y, width=300, height=200):
     detail_rect = pygame.Rect(x, y, width, height)
     pygame.draw.rect(screen, element["color"], detail_rect)
     
-    font = pygame.font.Font(None, 36)
-    symbol_text = font.render(element['symbol'], True, (255, 255, 255))
+    font = get_font(36)
+    symbol_text = render_text(font, element['symbol'], (255, 255, 255))
     screen.blit(symbol_text, (x + 10, y + 10))
     
-    font = pygame.font.Font(None, 24)
+    font = get_font(24)
     texts = [
         f"Name: {element['name']}",
         f"Atomic Number: {element['atomic_number']}",
@@ -561,7 +1517,7 @@ def draw_element_details(element, x, y, width=300, height=200):
     ]
     
     for i, text in enumerate(texts):
-        text_surface = font.render(text, True, (255, 255, 255))
+        text_surface = render_text(font, text, (255, 255, 255))
         screen.blit(text_surface, (x + 10, y + 50 + i * 30))
 
 def handle_lab_interaction(x, y, right_click=False):
@@ -573,7 +1529,7 @@ def handle_lab_interaction(x, y, right_click=False):
             if element in selected_lab_elements:
                 selected_lab_elements.remove(element)
         else:
-            if len(selected_lab_elements) < 6:  # Remove the check for element not in selected_lab_elements
+            if len(selected_lab_elements) < LAB_BENCH_SLOTS:  # Remove the check for element not in selected_lab_elements
                 selected_lab_elements.append(element)
         return
 
@@ -597,6 +1553,7 @@ def handle_lab_interaction(x, y, right_click=False):
                 tokens += 1
                 ore_chunks += 2
             selected_lab_elements = []
+            journal_action("combine")
         else:
             combination_result = "Select at least 2 elements to combine."
 
@@ -607,30 +1564,18 @@ def handle_lab_interaction(x, y, right_click=False):
         combination_result = None
 
 def get_clicked_element(x, y):
-    scale = 0.9
-    element_size = int(40 * scale)
-    table_width = 18 * element_size + 17 * 5 * scale
-    x_start = (width - table_width) // 2
-    y_start = 100  # This should match the y_offset in draw_lab_periodic_table
-
-    for i, element in enumerate(elements):
-        element_x = int(x_start + (i % 18) * (element_size + 5 * scale))
-        element_y = int(y_start + (i // 18) * (element_size + 5 * scale))
-        element_rect = pygame.Rect(element_x, element_y, element_size, element_size)
-        if element_rect.collidepoint(x, y):
-            return element
-    return None
+    return LAB_TABLE_LAYOUT.element_at(x, y)
 
 def draw_combination_result(result, x, y):
-    font = pygame.font.Font(None, 24)
-    title_font = pygame.font.Font(None, 30)
+    font = get_font(24)
+    title_font = get_font(30)
     result_rect = pygame.Rect(x, y, 300, 200)
     pygame.draw.rect(screen, (200, 200, 200), result_rect)
 
     # Function to render emoji
     def render_emoji(emoji, size):
-        font = pygame.font.Font(font_path, size)
-        return font.render(emoji, True, (0, 0, 0))
+        font = get_font(size, font_path)
+        return render_text(font, emoji, (0, 0, 0))
 
     # Draw token emoji
     token_emoji = render_emoji('🪙', 48)
@@ -638,7 +1583,7 @@ def draw_combination_result(result, x, y):
     
     # Superimpose token count
     token_count = result.get('tokens', 1) if isinstance(result, dict) else 1
-    count_text = title_font.render(str(token_count), True, (255, 255, 255))
+    count_text = render_text(title_font, str(token_count), (255, 255, 255))
     
     # Center the text, then shift right by half its width
     count_rect = count_text.get_rect(center=(x + 34, y + 34))
@@ -652,77 +1597,105 @@ def draw_combination_result(result, x, y):
         description = result.get('description', 'Missing description')
         trivia = result.get('trivia', 'Missing trivia')
 
-        name_text = title_font.render(compound_name, True, (0, 0, 0))
-        formula_text = font.render(formula, True, (0, 0, 0))
+        plan = synthesis_planner.plan(result) if synthesis_planner is not None else None  # No cost until the planner is built
+        if plan:
+            ore, steps = plan
+            formula = f"{formula}  {ore:g} ORE" + (f", {len(steps)} steps" if len(steps) > 1 else "")
+        name_text = render_text(title_font, compound_name, (0, 0, 0))
+        formula_text = render_text(font, formula, (0, 0, 0))
         screen.blit(name_text, (x + 70, y + 10))
         screen.blit(formula_text, (x + 70, y + 40))
 
         # Display description with text wrapping
-        desc_lines = wrap_text(description, font, 280)
-        for i, line in enumerate(desc_lines[:3]):
-            desc_text = font.render(line, True, (0, 0, 0))
-            screen.blit(desc_text, (x + 10, y + 70 + i * 20))
+        screen.blit(render_paragraph(description, font, 280, (0, 0, 0), 20, max_lines=3), (x + 10, y + 70))
 
         # Display trivia with text wrapping
-        trivia_lines = wrap_text("Trivia: " + trivia, font, 280)
-        for i, line in enumerate(trivia_lines[:2]):
-            trivia_text = font.render(line, True, (0, 0, 0))
-            screen.blit(trivia_text, (x + 10, y + 140 + i * 20))
+        screen.blit(render_paragraph("Trivia: " + trivia, font, 280, (0, 0, 0), 20, max_lines=2), (x + 10, y + 140))
 
     else:  # Unknown combination
-        unknown_text = title_font.render("UNKNOWN ORE", True, (0, 0, 0))
+        unknown_text = render_text(title_font, "UNKNOWN ORE", (0, 0, 0))
         screen.blit(unknown_text, (x + 70, y + 10))
         
-        value_text = font.render("VALUE: 1 TOKEN", True, (0, 0, 0))
+        value_text = render_text(font, "VALUE: 1 TOKEN", (0, 0, 0))
         screen.blit(value_text, (x + 70, y + 40))
         
         description = "You've discovered an UNKNOWN combination! Keep experimenting to earn more tokens."
-        desc_lines = wrap_text(description, font, 280)
-        for i, line in enumerate(desc_lines):
-            desc_text = font.render(line, True, (0, 0, 0))
-            screen.blit(desc_text, (x + 10, y + 70 + i * 20))
+        screen.blit(render_paragraph(description, font, 280, (0, 0, 0), 20), (x + 10, y + 70))
         
         trivia = "Tip: Play the slot machine to earn more tokens!"
-        trivia_lines = wrap_text("Trivia: " + trivia, font, 280)
-        for i, line in enumerate(trivia_lines):
-            trivia_text = font.render(line, True, (0, 0, 0))
-            screen.blit(trivia_text, (x + 10, y + 140 + i * 20))
-
+        screen.blit(render_paragraph("Trivia: " + trivia, font, 280, (0, 0, 0), 20), (x + 10, y + 140))
+
+# Text layout cache, keyed by (text, font, max_width)
+TEXT_LAYOUT_CACHE_SIZE = 256
+WRAP_KERNING_SLACK = 2  # Per word already on the line: how far under the limit an estimate is re-measured
+
+def hyphenate(word, font, max_width):
+    """Split a word wider than max_width into hyphenated pieces that each fit."""
+    pieces = []
+    while len(word) > 1 and font.size(word)[0] > max_width:
+        # Binary search for the longest prefix that still fits with its hyphen
+        low, high = 1, len(word) - 1
+        while low < high:
+            mid = (low + high + 1) // 2
+            if font.size(word[:mid] + '-')[0] <= max_width:
+                low = mid
+            else:
+                high = mid - 1
+        if font.size(word[:low] + '-')[0] > max_width:
+            break  # Not even one character fits; leave the rest whole rather than emit empty pieces
+        pieces.append(word[:low] + '-')
+        word = word[low:]
+    pieces.append(word)
+    return pieces
+
+@functools.lru_cache(maxsize=TEXT_LAYOUT_CACHE_SIZE)
 def wrap_text(text, font, max_width):
-    words = text.split()
+    """Break text into lines no wider than max_width. Each word is measured once."""
+    space_width = font.size(' ')[0]
     lines = []
     current_line = []
-    for word in words:
-        test_line = ' '.join(current_line + [word])
-        if font.size(test_line)[0] <= max_width:
-            current_line.append(word)
-        else:
-            lines.append(' '.join(current_line))
-            current_line = [word]
+    current_width = 0
+    for word in text.split():
+        word_width = font.size(word)[0]
+        pieces = [word] if word_width <= max_width else hyphenate(word, font, max_width)
+        for piece in pieces:
+            piece_width = word_width if len(pieces) == 1 else font.size(piece)[0]
+            line_width = current_width + space_width + piece_width if current_line else piece_width
+            if current_line and line_width > max_width - WRAP_KERNING_SLACK * len(current_line):
+                # Kerning and rounding make summed word widths drift by a pixel or so per word,
+                # so measure the real line whenever it could be at or over the limit
+                line_width = font.size(' '.join(current_line + [piece]))[0]
+            if line_width <= max_width:
+                current_line.append(piece)
+                current_width = line_width
+            else:
+                if current_line:
+                    lines.append(' '.join(current_line))
+                current_line = [piece]
+                current_width = piece_width
     lines.append(' '.join(current_line))
-    return lines
+    return tuple(lines)
+
+@functools.lru_cache(maxsize=TEXT_LAYOUT_CACHE_SIZE)
+def _render_paragraph_cached(text, font, max_width, color, line_height, max_lines):
+    lines = wrap_text(text, font, max_width)[:max_lines]
+    paragraph = pygame.Surface((max_width, (len(lines) - 1) * line_height + font.get_height()), pygame.SRCALPHA)
+    for i, line in enumerate(lines):
+        paragraph.blit(render_text(font, line, color), (0, i * line_height))
+    return paragraph
+
+def render_paragraph(text, font, max_width, color, line_height, max_lines=None):
+    """Wrap and render text into a single cached surface. Returned surfaces are shared; don't draw on them."""
+    return _render_paragraph_cached(text, font, max_width, tuple(color), line_height, max_lines)
     
 def combine_elements(selected_elements):
-    global compounds
-    
     selected_symbols = [e['symbol'] for e in selected_elements]
-    element_counts = {symbol: selected_symbols.count(symbol) for symbol in set(selected_symbols)}
+    matches = compound_index.matches(collections.Counter(selected_symbols))
     
-    possible_compounds = []
-    for compound in compounds:
-        if set(compound['elements']) == set(selected_symbols):
-            compound_element_counts = {element: compound['formula'].count(element) for element in set(compound['elements'])}
-            if all(element_counts[element] >= count for element, count in compound_element_counts.items()):
-                possible_compounds.append(compound)
-    
-    if possible_compounds:
+    if matches:
         # Weight the compounds based on how closely they match the selected elements
-        weights = []
-        for compound in possible_compounds:
-            compound_element_counts = {element: compound['formula'].count(element) for element in set(compound['elements'])}
-            weight = sum(min(element_counts[element], compound_element_counts.get(element, 0)) for element in set(selected_symbols))
-            weights.append(weight)
-        
+        possible_compounds = [compound for compound, _ in matches]
+        weights = [weight for _, weight in matches]
         result = random.choices(possible_compounds, weights=weights, k=1)[0]
         result['tokens'] = len(selected_elements) * 2  # 2x tokens for every element used
         return result
@@ -739,57 +1712,79 @@ def combine_elements(selected_elements):
     
 def handle_lab_element_selection(x, y):
     global selected_lab_elements
-    scale = 0.8
-    element_size = int(40 * scale)
-    for i, element in enumerate(elements):
-        element_rect = pygame.Rect(
-            int(50 * scale + (i % 18) * (element_size + 5 * scale)),
-            int(100 + (50 * scale) + (i // 18) * (element_size + 5 * scale)),
-            element_size,
-            element_size
-        )
-        if element_rect.collidepoint(x, y) and element_quantities.get(element['symbol'], 0) > 0:
-            if element not in selected_lab_elements:
-                if len(selected_lab_elements) < 6:
-                    selected_lab_elements.append(element)
-                    element_quantities[element['symbol']] -= 1
-            else:
-                selected_lab_elements.remove(element)
-                element_quantities[element['symbol']] += 1
+    element = LAB_TABLE_LAYOUT.element_at(x, y)
+    if element and element_quantities.get(element['symbol'], 0) > 0:
+        if element not in selected_lab_elements:
+            if len(selected_lab_elements) < LAB_BENCH_SLOTS:
+                selected_lab_elements.append(element)
+                element_quantities[element['symbol']] -= 1
+        else:
+            selected_lab_elements.remove(element)
+            element_quantities[element['symbol']] += 1
+
+def get_reel_strips(reel_width, reel_height):
+    """Render each reel once into a tall strip, repeated so any scroll offset has a full window below it."""
+    global reel_strips
+    if reel_strips is None:
+        reel_strips = []
+        for reel in reels:
+            cycle_height = len(reel) * REEL_SYMBOL_SPACING
+            copies = math.ceil(reel_height / cycle_height) + 1
+            strip = pygame.Surface((reel_width, cycle_height * copies))
+            strip.fill((200, 200, 200))
+            for k in range(len(reel) * copies):
+                text = render_text(slot_font, reel[k % len(reel)], (0, 0, 0))
+                strip.blit(text, text.get_rect(center=(reel_width // 2, 50 + k * REEL_SYMBOL_SPACING)))
+            reel_strips.append(strip)
+    return reel_strips
+
+def reel_travel(elapsed, distance, stop_time, cruise_speed):
+    """Distance covered after elapsed seconds on the accelerate/cruise/decelerate profile."""
+    if elapsed >= stop_time:
+        return distance
+    if elapsed < SPIN_ACCELERATION_TIME:
+        return 0.5 * cruise_speed / SPIN_ACCELERATION_TIME * elapsed ** 2
+    if elapsed < stop_time - SPIN_DECELERATION_TIME:
+        return cruise_speed * (elapsed - SPIN_ACCELERATION_TIME / 2)
+    remaining = stop_time - elapsed
+    return distance - 0.5 * cruise_speed / SPIN_DECELERATION_TIME * remaining ** 2
 
 def spin_reels():
-    global spinning, spin_frames, reel_positions, reel_results, spin_slowdown
+    global spinning, spin_elapsed, reel_spin_plans
     
     if spin_sound:
         spin_sound.play()
     
     spinning = True
-    spin_frames = 0
-    spin_slowdown = 1
+    spin_elapsed = 0.0
+    reel_spin_plans = []
     
     for i in range(3):
         reel_positions[i] = random.randint(0, len(reels[i]) - 1)
-        for j in range(3):
-            reel_results[j][i] = reels[i][(reel_positions[i] + j) % len(reels[i])]
+        stop_time = SPIN_DURATION - i * SPIN_STAGGER
+        moving_time = stop_time - (SPIN_ACCELERATION_TIME + SPIN_DECELERATION_TIME) / 2
+        # Whole loops at roughly the cruise speed, then land exactly on the chosen position
+        start = reel_offsets[i] % len(reels[i])
+        to_target = (reel_positions[i] - start) % len(reels[i])
+        loops = max(1, round((SPIN_CRUISE_SPEED * moving_time - to_target) / len(reels[i])))
+        distance = to_target + loops * len(reels[i])
+        reel_spin_plans.append((start, distance, stop_time, distance / moving_time))
             
-def update_spinning_reels():
-    global spinning, spin_frames, reel_positions, reel_results, spin_slowdown
+def update_spinning_reels(dt):
+    global spinning, spin_elapsed
     
     if spinning:
-        spin_frames += 1
-        if spin_frames >= max_spin_frames:
+        spin_elapsed += dt
+        for i, (start, distance, stop_time, cruise_speed) in enumerate(reel_spin_plans):
+            reel_offsets[i] = start + reel_travel(spin_elapsed, distance, stop_time, cruise_speed)
+            shown = round(reel_offsets[i]) % len(reels[i])
+            for j in range(3):
+                reel_results[j][i] = reels[i][(shown + j) % len(reels[i])]
+
+        if spin_elapsed >= max(plan[2] for plan in reel_spin_plans):
             spinning = False
-            spin_slowdown = 1
             evaluate_spin()
-        else:
-            for i in range(3):  # Ensure all three reels are updated
-                if spin_frames < max_spin_frames - i * 20:
-                    reel_positions[i] = (reel_positions[i] + spin_slowdown) % len(reels[i])
-                    for j in range(3):
-                        reel_results[j][i] = reels[i][(reel_positions[i] + j) % len(reels[i])]
-            
-            if spin_frames > max_spin_frames // 2:
-                spin_slowdown = max(1, spin_slowdown - 0.05)
+            request_full_redraw()  # Counters may have changed
 
 def handle_button_click(label):
     global playing_slot_machine, tokens, current_screen
@@ -814,38 +1809,36 @@ def handle_button_click(label):
     elif label == "CONFIRM":
         if elements_picked >= max_elements:
             element_selection_confirmed = True
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            save_game(f"autosave_{timestamp}")
+            save_game()  # The game's history keeps this point; no separate timestamped copy
 
 def handle_element_selection(x, y):
     global selected_elements, elements_picked, element_quantities, element_purchase_quantities, enlarged_element, feeding_quantities
-    element_size = 40
-    for i, element in enumerate(elements):
-        element_rect = pygame.Rect(50 + (i % 18) * (element_size + 5), 50 + (i // 18) * (element_size + 5), element_size, element_size)
-        if element_rect.collidepoint(x, y):
-            if element not in selected_elements:
-                if len(selected_elements) >= max_elements:
-                    removed_element = selected_elements.pop(0)
-                    element_quantities.pop(removed_element['symbol'], None)
-                    element_purchase_quantities.pop(removed_element['symbol'], None)
-                    feeding_quantities.pop(removed_element['symbol'], None)
-                selected_elements.append(element)
-                element_quantities[element['symbol']] = 0
-                element_purchase_quantities[element['symbol']] = 0
-                feeding_quantities[element['symbol']] = 0
-                enlarged_element = element
-            else:
-                selected_elements.remove(element)
-                element_quantities.pop(element['symbol'], None)
-                element_purchase_quantities.pop(element['symbol'], None)
-                feeding_quantities.pop(element['symbol'], None)
-                if enlarged_element == element:
-                    enlarged_element = None
-            elements_picked = len(selected_elements)
-            if pick_sound:
-                pick_sound.play()
-            return True
-    return False
+    element = SELECTION_TABLE_LAYOUT.element_at(x, y)
+    if element is None:
+        return False
+    if element not in selected_elements:
+        if len(selected_elements) >= max_elements:
+            removed_element = selected_elements.pop(0)
+            element_quantities.pop(removed_element['symbol'], None)
+            element_purchase_quantities.pop(removed_element['symbol'], None)
+            feeding_quantities.pop(removed_element['symbol'], None)
+        selected_elements.append(element)
+        element_quantities[element['symbol']] = 0
+        element_purchase_quantities[element['symbol']] = 0
+        feeding_quantities[element['symbol']] = 0
+        enlarged_element = element
+    else:
+        selected_elements.remove(element)
+        element_quantities.pop(element['symbol'], None)
+        element_purchase_quantities.pop(element['symbol'], None)
+        feeding_quantities.pop(element['symbol'], None)
+        if enlarged_element == element:
+            enlarged_element = None
+    elements_picked = len(selected_elements)
+    if pick_sound:
+        pick_sound.play()
+    journal_action("pick")
+    return True
 
 def draw_element_selection_screen():
     screen.fill((0, 0, 0))
@@ -856,32 +1849,33 @@ def draw_element_selection_screen():
         x = width // 2 - 80 + i * 100  # Changed from -100 to -80
         y = height - 170
         pygame.draw.rect(screen, element["color"], (x, y, 80, 80))
-        font = pygame.font.Font(None, 36)
-        text = font.render(element["symbol"], True, (255, 255, 255))
+        font = get_font(36)
+        text = render_text(font, element["symbol"], (255, 255, 255))
         screen.blit(text, (x + 20, y + 20))
     
     # Draw CONFIRM button
     button_color = (0, 255, 0) if len(selected_elements) == max_elements else (100, 100, 100)
     confirm_button = pygame.Rect(width - 200, height - 100, 150, 50)
     pygame.draw.rect(screen, button_color, confirm_button)
-    font = pygame.font.Font(None, 36)
-    text = font.render("CONFIRM", True, (0, 0, 0))
+    font = get_font(36)
+    text = render_text(font, "CONFIRM", (0, 0, 0))
     text_rect = text.get_rect(center=confirm_button.center)
     screen.blit(text, text_rect)
 
     # Draw instructions
-    instruction_font = pygame.font.Font(None, 24)
+    instruction_font = get_font(24)
     instruction_text = f"Select {max_elements} elements. Left click to select. Confirm when done."
-    instruction_surface = instruction_font.render(instruction_text, True, (255, 255, 255))
+    instruction_surface = render_text(instruction_font, instruction_text, (255, 255, 255))
     screen.blit(instruction_surface, (10, 10))
+    draw_element_tooltip(SELECTION_TABLE_LAYOUT)
 
 def draw_element_purchase_screen():
     global ore_chunks, element_purchase_quantities, element_quantities
     screen.fill((0, 0, 0))
-    font = pygame.font.Font(None, 36)
+    font = get_font(36)
     y_offset = 50
     
-    ore_text = font.render(f"Available ORE: {ore_chunks}", True, (255, 255, 255))
+    ore_text = render_text(font, f"Available ORE: {ore_chunks}", (255, 255, 255))
     screen.blit(ore_text, (20, y_offset))
     y_offset += 50
 
@@ -889,7 +1883,7 @@ def draw_element_purchase_screen():
         symbol = element['symbol']
         on_hand_quantity = element_quantities.get(symbol, 0)
         purchase_quantity = element_purchase_quantities.get(symbol, 0)
-        text = font.render(f"{symbol}: {purchase_quantity}", True, element['color'])
+        text = render_text(font, f"{symbol}: {purchase_quantity}", element['color'])
         screen.blit(text, (20, y_offset))
         
         plus_rect = pygame.Rect(200, y_offset, 30, 30)
@@ -897,8 +1891,8 @@ def draw_element_purchase_screen():
         pygame.draw.rect(screen, (0, 255, 0), plus_rect)
         pygame.draw.rect(screen, (255, 0, 0), minus_rect)
         
-        plus_text = font.render("+", True, (0, 0, 0))
-        minus_text = font.render("-", True, (0, 0, 0))
+        plus_text = render_text(font, "+", (0, 0, 0))
+        minus_text = render_text(font, "-", (0, 0, 0))
         screen.blit(plus_text, (205, y_offset))
         screen.blit(minus_text, (250, y_offset))
         
@@ -909,18 +1903,18 @@ def draw_element_purchase_screen():
         pygame.draw.rect(screen, (0, 255, 0), slider_fill_rect)
         
         # Display current quantity
-        quantity_text = font.render(f"{purchase_quantity}", True, (255, 255, 255))
+        quantity_text = render_text(font, f"{purchase_quantity}", (255, 255, 255))
         screen.blit(quantity_text, (410, y_offset))
         
         # Display on-hand quantity
-        on_hand_text = font.render(f"On Hand: {on_hand_quantity}", True, (255, 255, 255))
+        on_hand_text = render_text(font, f"On Hand: {on_hand_quantity}", (255, 255, 255))
         screen.blit(on_hand_text, (500, y_offset))
         
         y_offset += 50
 
     confirm_rect = pygame.Rect(width // 2 - 75, height - 100, 150, 50)
     pygame.draw.rect(screen, (0, 255, 0), confirm_rect)
-    confirm_text = font.render("Confirm", True, (0, 0, 0))
+    confirm_text = render_text(font, "Confirm", (0, 0, 0))
     screen.blit(confirm_text, (width // 2 - 40, height - 90))
 
 def handle_element_purchase(x, y, button_down):
@@ -956,10 +1950,10 @@ def handle_element_purchase(x, y, button_down):
             element_purchase_quantities[symbol] = 0
         purchasing_elements = False
         current_screen = "main_game"
-        save_game()  # This will create a new timestamped save
+        journal_action("purchase")
 
 def handle_feeding_selection(x, y, button_down):
-    global feeding_quantities, element_quantities, feeding_elements, current_screen, growth_level, egg_level, lifetime_fed
+    global feeding_quantities, element_quantities, feeding_elements, current_screen, growth_level, lifetime_fed
     y_offset = 50
     for element in selected_elements:
         symbol = element['symbol']
@@ -989,20 +1983,16 @@ def handle_feeding_selection(x, y, button_down):
                 lifetime_fed[symbol] += quantity
                 growth_level += quantity
 
-        while growth_level >= max_growth_per_level:
-            egg_level += 1
-            growth_level -= max_growth_per_level
-            print(f"Egg leveled up to {egg_level}!")  # Add this for debugging
-
         feeding_elements = False
         current_screen = "main_game"
-        save_game()
+        check_egg_evolution()  # Levels up (with its overlay) before the feed is journaled
+        journal_action("feed")
         print(f"Total feed: {total_feed}, New growth level: {growth_level}")  # Add this for debugging
 
 def draw_feeding_screen():
     global feeding_quantities, element_quantities
     screen.fill((0, 0, 0))
-    font = pygame.font.Font(None, 36)
+    font = get_font(36)
     y_offset = 50
 
     for element in selected_elements:
@@ -1011,7 +2001,7 @@ def draw_feeding_screen():
         if symbol not in feeding_quantities:
             feeding_quantities[symbol] = 0
         
-        text = font.render(f"{symbol}: {feeding_quantities[symbol]}", True, element['color'])
+        text = render_text(font, f"{symbol}: {feeding_quantities[symbol]}", element['color'])
         screen.blit(text, (20, y_offset))
 
         plus_rect = pygame.Rect(200, y_offset, 30, 30)
@@ -1019,8 +2009,8 @@ def draw_feeding_screen():
         pygame.draw.rect(screen, (0, 255, 0), plus_rect)
         pygame.draw.rect(screen, (255, 0, 0), minus_rect)
 
-        plus_text = font.render("+", True, (0, 0, 0))
-        minus_text = font.render("-", True, (0, 0, 0))
+        plus_text = render_text(font, "+", (0, 0, 0))
+        minus_text = render_text(font, "-", (0, 0, 0))
         screen.blit(plus_text, (205, y_offset))
         screen.blit(minus_text, (250, y_offset))
 
@@ -1031,18 +2021,18 @@ def draw_feeding_screen():
         pygame.draw.rect(screen, (0, 255, 0), slider_fill_rect)
 
         # Display current feeding quantity
-        quantity_text = font.render(f"{feeding_quantities[symbol]}", True, (255, 255, 255))
+        quantity_text = render_text(font, f"{feeding_quantities[symbol]}", (255, 255, 255))
         screen.blit(quantity_text, (410, y_offset))
 
         # Display on-hand quantity
-        on_hand_text = font.render(f"On Hand: {on_hand_quantity}", True, (255, 255, 255))
+        on_hand_text = render_text(font, f"On Hand: {on_hand_quantity}", (255, 255, 255))
         screen.blit(on_hand_text, (500, y_offset))
 
         y_offset += 50
 
     confirm_rect = pygame.Rect(width // 2 - 75, height - 100, 150, 50)
     pygame.draw.rect(screen, (0, 255, 0), confirm_rect)
-    confirm_text = font.render("Confirm", True, (0, 0, 0))
+    confirm_text = render_text(font, "Confirm", (0, 0, 0))
     screen.blit(confirm_text, (width // 2 - 40, height - 90))
 
 def redeem_ore_for_elements():
@@ -1078,6 +2068,7 @@ def evolve_egg():
         egg_level += 1
         growth_level = 0
         print(f"Egg evolved to level {egg_level}!")
+        overlays.push(f"LEVEL {egg_level}!", (0, 255, 255), 60)
     else:
         print("Not enough growth to evolve!")
 
@@ -1110,7 +2101,7 @@ def draw_main_game_screen():
     if creature_displayed:
         draw_creature()
     else:
-        egg_creature.draw(screen)
+        mark_dirty(egg_creature.draw(screen))
     
     # Draw selected elements
     element_width = 80
@@ -1122,11 +2113,11 @@ def draw_main_game_screen():
         x = start_x + i * element_spacing
         y = 50
         pygame.draw.rect(screen, element["color"], (x, y, element_width, element_width))
-        font = pygame.font.Font(None, 36)
-        text = font.render(element["symbol"], True, (255, 255, 255))
+        font = get_font(36)
+        text = render_text(font, element["symbol"], (255, 255, 255))
         text_rect = text.get_rect(center=(x + element_width // 2, y + element_width // 2))
         screen.blit(text, text_rect)
-        quantity_text = font.render(f"{lifetime_fed[element['symbol']]}", True, (255, 255, 255))
+        quantity_text = render_text(font, f"{lifetime_fed[element['symbol']]}", (255, 255, 255))
         quantity_rect = quantity_text.get_rect(center=(x + element_width // 2, y + element_width + 20))
         screen.blit(quantity_text, quantity_rect)
     
@@ -1134,7 +2125,7 @@ def draw_main_game_screen():
     draw_buttons()
     
     # Draw egg info
-    font = pygame.font.Font(None, 24)
+    font = get_font(24)
     texts = [
         f"Egg Level: {egg_level}",
         f"Growth: {growth_level}/{max_growth_per_level}",
@@ -1144,26 +2135,29 @@ def draw_main_game_screen():
         f"Theme: {'1' if current_theme == THEME_SONG_1 else '2'}",
     ]
     for i, text in enumerate(texts):
-        surface = font.render(text, True, (255, 255, 255))
+        surface = render_text(font, text, (255, 255, 255))
         screen.blit(surface, (10, 10 + i * 30))
         
 def draw_egg_info():
-    font = pygame.font.Font(None, 24)
+    font = get_font(24)
     texts = [
         f"Egg Level: {egg_level}",
         f"Growth: {growth_level}/{max_growth_per_level}",
     ]
     
     for i, text in enumerate(texts):
-        surface = font.render(text, True, (255, 255, 255))
+        surface = render_text(font, text, (255, 255, 255))
         screen.blit(surface, (10, 10 + i * 30))
 
 def check_egg_evolution():
     global egg_level, growth_level, max_growth_per_level, creature_displayed
+    start_level = egg_level
     while growth_level >= max_growth_per_level:
         egg_level += 1
         growth_level -= max_growth_per_level
         print(f"Egg evolved to level {egg_level}!")  # Debugging statement
+    if egg_level > start_level:
+        overlays.push(f"LEVEL {egg_level}!", (0, 255, 255), 60)
     if egg_level >= 10 and not creature_displayed:
         hatch_creature()
 
@@ -1203,6 +2197,7 @@ def hatch_creature():
     # Mark the creature as displayed
     creature_displayed = True
     print(f"Creature hatched with traits: {creature_traits}")
+    overlays.push("YOUR CREATURE HATCHED!", (0, 255, 0), 60, 3.0)
     
 def evaluate_spin():
     global ore_chunks
@@ -1220,109 +2215,880 @@ def evaluate_spin():
             win_sound.play()
         ore_chunks += payout
         show_win_message(payout)
+    journal_action("spin")
 
 def show_win_message(payout):
-    font = pygame.font.Font(None, 72)
-    text = font.render(f"WINNER! +{payout} ORE", True, (255, 255, 0))
-    text_rect = text.get_rect(center=(width // 2, height // 2))
-    screen.blit(text, text_rect)
-    pygame.display.flip()
-    pygame.time.wait(2000)  # Display the message for 2 seconds
+    overlays.push(f"WINNER! +{payout} ORE")
+
+AUTOSAVE_INTERVAL = 300  # Seconds; the action journal covers progress in between
+autosave_stats = {"written": 0, "skipped": 0}
 
 def autosave_game():
     global last_autosave_time
     current_time = time.time()
-    if current_time - last_autosave_time >= 60:  # Autosave every 60 seconds
-        save_game()
+    if current_time - last_autosave_time >= AUTOSAVE_INTERVAL:
+        # Nothing to save until a game has been started or loaded
+        written = current_game_name is not None and save_game() is not None
+        autosave_stats["written" if written else "skipped"] += 1
+        if written:
+            save_writer.request_compaction()
         last_autosave_time = current_time
 
-def save_game(game_name=None):
-    global current_game_name
-    
-    if game_name is None:
-        if current_game_name is None:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            current_game_name = f"game_{timestamp}"
-        game_name = current_game_name
-    
-    game_data = {
+# Last snapshot handed to the writer per game; a save equal to it is skipped
+persisted_snapshots = {}
+
+def game_snapshot():
+    # Copies, so the writer thread never sees later mutations
+    return {
         "ore_chunks": ore_chunks,
         "selected_elements": [e['symbol'] for e in selected_elements],
-        "element_quantities": element_quantities,
+        "element_quantities": dict(element_quantities),
         "egg_level": egg_level,
         "growth_level": growth_level,
         "tokens": tokens,
-        "lifetime_fed": lifetime_fed,
+        "lifetime_fed": dict(lifetime_fed),
         "music_on": music_on,
         "current_theme": current_theme
     }
+
+def snapshot_patch(old, new):
+    """JSON merge patch (RFC 7396) turning old into new. Nested dicts are diffed key by key."""
+    patch = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            changed = {k: v for k, v in value.items() if previous.get(k) != v or k not in previous}
+            changed.update((k, None) for k in previous if k not in value)
+            if changed:
+                patch[key] = changed
+        elif key not in old or previous != value:
+            patch[key] = value
+    return patch
+
+def apply_merge_patch(target, patch):
+    result = dict(target)
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        elif isinstance(value, dict):
+            base = result.get(key)
+            result[key] = apply_merge_patch(base if isinstance(base, dict) else {}, value)
+        else:
+            result[key] = value
+    return result
+
+# State the last journal entry left the current game in
+journal_base = None
+
+def journal_action(action):
+    """Append what this action changed to the write-ahead journal and the game's history."""
+    global journal_base
+    if current_game_name is None:
+        return
+    state = game_snapshot()
+    patch = snapshot_patch(journal_base or {}, state)
+    journal_base = state
+    if patch:
+        save_writer.ensure_running()  # Owns the batched fsync
+        journal.append(current_game_name, action, patch)
+        record_history(action, state)
+
+# [game, state at the last point, deltas since the last base]; None until the game's first point this session
+history_cursor = None
+
+def record_history(action, state):
+    global history_cursor
+    if history_cursor is None or history_cursor[0] != current_game_name:
+        history_cursor = [current_game_name, None, 0]
+    game, previous, deltas = history_cursor
+    if previous is None or deltas >= HISTORY_REBASE_EVERY:
+        kind, payload, deltas = HISTORY_BASE, encode_save_record(state), 0
+    else:
+        patch = snapshot_patch(previous, state)
+        if not patch:
+            return
+        kind, payload, deltas = HISTORY_DELTA, json.dumps(patch, separators=(",", ":")), deltas + 1
+    save_writer.append_history(game, action, kind, payload)  # The writer numbers the point
+    history_cursor = [game, state, deltas]
+
+def game_history(limit=50):
+    """Newest-first (seq, created, action) points the current game can be rewound to."""
+    save_writer.flush()
+    return save_catalog.history(current_game_name, limit) if current_game_name else []
+
+def rewind_game(seq):
+    """Restore the current game to history point seq, and save it so the journal cannot replay past it."""
+    save_writer.flush()
+    if current_game_name is None or not load_game(current_game_name, at_history=seq):
+        return False
+    save_game()
+    return True
+
+def rewind_before_last(action):
+    """Rewind to the point just before the most recent action of this kind, e.g. "spin"."""
+    points = game_history()
+    for i, (seq, _, point_action) in enumerate(points):
+        if point_action == action and i + 1 < len(points):
+            return rewind_game(points[i + 1][0])
+    return False
+
+def save_game(game_name=None):
+    """Queue a save of the current game. Returns its name, or None when nothing changed since the last save."""
+    global current_game_name, journal_base
     
-    # Load existing saves
-    all_saves = load_all_saves()
-    
-    # Add or update the current save
-    all_saves[game_name] = game_data
+    if game_name is None:
+        if current_game_name is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            current_game_name = f"game_{timestamp}"
+        game_name = current_game_name
     
-    # Save all games to a single JSON file
-    with open("all_saves.json", "w") as f:
-        json.dump(all_saves, f)
+    game_data = game_snapshot()
+    game_data["journal_seq"] = journal.seq
+    if persisted_snapshots.get(game_name) == game_data:
+        return None
     
-    print(f"Game saved as {game_name}")
+    save_writer.submit(game_name, game_data, current_game_name or game_name)
+    persisted_snapshots[game_name] = game_data
+    if game_name == current_game_name:
+        journal_base = game_snapshot()
+        record_history("save", journal_base)
     return game_name
 
-def load_game(game_name):
-    global ore_chunks, selected_elements, element_quantities, egg_level, growth_level, tokens, lifetime_fed, current_game_name, music_on, current_theme
+def load_game(game_name, at_history=None):
+    """Load a save, or with at_history, the game as it was at that point in its history."""
+    global ore_chunks, selected_elements, element_quantities, egg_level, growth_level, tokens, lifetime_fed, current_game_name, music_on, current_theme, journal_base, history_cursor
     
-    all_saves = load_all_saves()
+    game_data = save_writer.pending_snapshot(game_name) or save_catalog.load(game_name)
+    if game_data is not None and at_history is not None:
+        stored_data, game_data = game_data, save_catalog.history_state(game_name, at_history)
     
-    if game_name not in all_saves:
+    if game_data is None:
         print(f"Save file {game_name} not found.")
         return False
     
-    game_data = all_saves[game_name]
+    if at_history is None:
+        # Replay journaled actions that happened after this snapshot was taken
+        stored_data = game_data
+        replayed = journal.entries_after(game_name, stored_data.get("journal_seq", 0))
+        for entry in replayed:
+            game_data = apply_merge_patch(game_data, entry["patch"])
+        if replayed:
+            print(f"Replayed {len(replayed)} journaled actions for {game_name}")
+    else:
+        replayed = []
+    snapshot_seq = stored_data.get("journal_seq", 0)
+    journal.advance(snapshot_seq)
     
     ore_chunks = game_data["ore_chunks"]
     selected_elements = [next(e for e in elements if e['symbol'] == symbol) for symbol in game_data["selected_elements"]]
-    element_quantities = game_data["element_quantities"]
+    element_quantities = dict(game_data["element_quantities"])
     egg_level = game_data["egg_level"]
     growth_level = game_data["growth_level"]
     tokens = game_data.get("tokens", 0)
-    lifetime_fed = game_data.get("lifetime_fed", {element['symbol']: 0 for element in elements})
+    lifetime_fed = dict(game_data.get("lifetime_fed", {element['symbol']: 0 for element in elements}))
     music_on = game_data.get("music_on", music_on)  # Use the current music_on state if not in save
     current_theme = game_data.get("current_theme", current_theme)  # Use the current theme if not in save
+    rewinding = at_history is not None and current_game_name == game_name
     current_game_name = game_name
     
-    # Update music state based on loaded preferences
-    if music_on:
-        pygame.mixer.music.unpause()
-    else:
-        pygame.mixer.music.pause()
-    
-    # Load the correct theme song
-    pygame.mixer.music.load(current_theme)
-    pygame.mixer.music.play(-1)
-    
+    if not rewinding:  # Keep the music playing through a rewind
+        # Update music state based on loaded preferences
+        if music_on:
+            pygame.mixer.music.unpause()
+        else:
+            pygame.mixer.music.pause()
+        
+        # Load the correct theme song
+        pygame.mixer.music.load(current_theme)
+        pygame.mixer.music.play(-1)
+    
+    journal_base = game_snapshot()
+    history_cursor = None  # The next history point is a fresh base
+    # Replayed or rewound state is not in the database yet, so compare the next save with what is
+    persisted_snapshots[game_name] = stored_data if replayed or at_history is not None else dict(journal_base, journal_seq=snapshot_seq)
     check_and_evolve_on_startup()
     return True
 
-def load_all_saves():
-    if not os.path.exists("all_saves.json"):
-        return {}
-    
-    with open("all_saves.json", "r") as f:
-        return json.load(f)
+# Saves live in SQLite, one row per game, so saving touches only that game's record.
+# A pre-existing all_saves.json is imported once and renamed out of the way.
+SAVES_DB = "saves.db"
+LEGACY_SAVES_FILE = "all_saves.json"
+SAVES_SCHEMA_VERSION = 3
+
+# Compact binary save records. Layout (little-endian), format version 1:
+#   "EEGG", u8 format version, u8 flags, then the body (zlib-compressed when SAVE_FLAG_ZLIB is set):
+#   i64 ore_chunks, u16 egg_level, u16 growth_level, i64 tokens, u64 journal_seq, u8 music_on,
+#   u8 theme (index into SAVE_THEMES, or 255 then a u16-length UTF-8 path),
+#   u8 count + u8 atomic numbers (selected_elements),
+#   u16 count + (u8 atomic number, u32 quantity) pairs (element_quantities),
+#   u16 count + (u8 atomic number, u32 amount) pairs for the non-zero lifetime_fed entries.
+# Rows that cannot be encoded (unknown fields or symbols) are stored as JSON text instead.
+SAVE_MAGIC = b"EEGG"
+SAVE_FORMAT_VERSION = 1
+SAVE_FLAG_ZLIB = 1
+SAVE_FLAG_NO_AUDIO = 2  # The save predates music_on/current_theme
+SAVE_COMPRESS_MIN_BYTES = 96
+SAVE_HEADER = struct.Struct("<4sBB")
+SAVE_SCALARS = struct.Struct("<qHHqQB")
+SAVE_FIELDS = {"ore_chunks", "selected_elements", "element_quantities", "egg_level", "growth_level",
+               "tokens", "lifetime_fed", "music_on", "current_theme", "journal_seq"}
+SAVE_THEMES = (THEME_SONG_1, THEME_SONG_2)
+ELEMENT_SYMBOLS = (
+    "H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni Cu Zn Ga Ge As Se Br Kr "
+    "Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I Xe Cs Ba La Ce Pr Nd Pm Sm Eu Gd Tb Dy Ho Er Tm Yb "
+    "Lu Hf Ta W Re Os Ir Pt Au Hg Tl Pb Bi Po At Rn Fr Ra Ac Th Pa U Np Pu Am Cm Bk Cf Es Fm Md No Lr Rf "
+    "Db Sg Bh Hs Mt Ds Rg Cn Nh Fl Mc Lv Ts Og"
+).split()
+ATOMIC_NUMBERS = {symbol: i + 1 for i, symbol in enumerate(ELEMENT_SYMBOLS)}
+
+def encode_counts(counts, skip_zeros=False):
+    pairs = [(ATOMIC_NUMBERS[symbol], value) for symbol, value in counts.items() if value or not skip_zeros]
+    return struct.pack(f"<H{'BI' * len(pairs)}", len(pairs), *(item for pair in pairs for item in pair))
+
+def decode_counts(body, offset):
+    count, = struct.unpack_from("<H", body, offset)
+    values = struct.unpack_from(f"<{'BI' * count}", body, offset + 2)
+    counts = {ELEMENT_SYMBOLS[values[i] - 1]: values[i + 1] for i in range(0, len(values), 2)}
+    return counts, offset + 2 + 5 * count
+
+def encode_save(data):
+    """Pack a save into the binary format. Raises ValueError (or KeyError/struct.error) when it does not fit."""
+    if not SAVE_FIELDS.issuperset(data):
+        raise ValueError(f"unknown save fields: {sorted(set(data) - SAVE_FIELDS)}")
+    flags = 0 if "music_on" in data else SAVE_FLAG_NO_AUDIO
+    theme = data.get("current_theme", THEME_SONG_1)
+    theme_index = SAVE_THEMES.index(theme) if theme in SAVE_THEMES else 255
+    selected = [ATOMIC_NUMBERS[symbol] for symbol in data["selected_elements"]]
+    parts = [
+        SAVE_SCALARS.pack(data["ore_chunks"], data["egg_level"], data["growth_level"], data.get("tokens", 0),
+                          data.get("journal_seq", 0), bool(data.get("music_on", True))),
+        bytes([theme_index]),
+    ]
+    if theme_index == 255:
+        path = theme.encode("utf-8")
+        parts.append(struct.pack("<H", len(path)) + path)
+    parts.append(bytes([len(selected)] + selected))
+    parts.append(encode_counts(data["element_quantities"]))
+    parts.append(encode_counts(data.get("lifetime_fed", {}), skip_zeros=True))
+    body = b"".join(parts)
+    if len(body) >= SAVE_COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(body, 9)
+        if len(compressed) < len(body):
+            body, flags = compressed, flags | SAVE_FLAG_ZLIB
+    return SAVE_HEADER.pack(SAVE_MAGIC, SAVE_FORMAT_VERSION, flags) + body
+
+def decode_save_v1(body, flags):
+    ore_chunks, egg_level, growth_level, tokens, journal_seq, music_on = SAVE_SCALARS.unpack_from(body)
+    offset = SAVE_SCALARS.size
+    theme_index = body[offset]
+    offset += 1
+    if theme_index == 255:
+        length, = struct.unpack_from("<H", body, offset)
+        theme = body[offset + 2:offset + 2 + length].decode("utf-8")
+        offset += 2 + length
+    else:
+        theme = SAVE_THEMES[theme_index]
+    selected_count = body[offset]
+    selected = [ELEMENT_SYMBOLS[n - 1] for n in body[offset + 1:offset + 1 + selected_count]]
+    element_quantities, offset = decode_counts(body, offset + 1 + selected_count)
+    fed, offset = decode_counts(body, offset)
+    lifetime_fed = dict.fromkeys(ELEMENT_SYMBOLS, 0)
+    lifetime_fed.update(fed)
+    data = {
+        "ore_chunks": ore_chunks,
+        "selected_elements": selected,
+        "element_quantities": element_quantities,
+        "egg_level": egg_level,
+        "growth_level": growth_level,
+        "tokens": tokens,
+        "lifetime_fed": lifetime_fed,
+        "journal_seq": journal_seq,
+    }
+    if not flags & SAVE_FLAG_NO_AUDIO:
+        data["music_on"] = bool(music_on)
+        data["current_theme"] = theme
+    return data
+
+# Older format versions decode straight into the current save shape
+SAVE_DECODERS = {1: decode_save_v1}
+
+def decode_save(blob):
+    magic, version, flags = SAVE_HEADER.unpack_from(blob)
+    if magic != SAVE_MAGIC or version not in SAVE_DECODERS:
+        raise ValueError(f"unsupported save format {magic!r} v{version}")
+    body = blob[SAVE_HEADER.size:]
+    if flags & SAVE_FLAG_ZLIB:
+        body = zlib.decompress(body)
+    return SAVE_DECODERS[version](body, flags)
+
+def encode_save_record(data):
+    """Binary record when the save fits the format, JSON text otherwise."""
+    try:
+        return encode_save(data)
+    except (ValueError, KeyError, TypeError, struct.error):
+        return json.dumps(data)
+
+def decode_save_record(value):
+    return decode_save(value) if isinstance(value, bytes) else json.loads(value)
+
+# History: every journaled action and save of the current game adds a point. A point is
+# either a full base record or a JSON merge patch against the point before it; a fresh
+# base every HISTORY_REBASE_EVERY deltas keeps any rebuild to one base plus a short chain.
+HISTORY_BASE = 0
+HISTORY_DELTA = 1
+HISTORY_REBASE_EVERY = 32
+
+# Retention: besides each game's live save, keep its newest RETENTION_KEEP_RECENT copies,
+# then one copy per bucket, with buckets widening as the copies age.
+RETENTION_KEEP_RECENT = 10
+RETENTION_BUCKETS = ((86400, 3600), (30 * 86400, 86400), (None, 7 * 86400))  # (up to this age, one copy per this many seconds)
+HISTORY_KEEP_RECENT = 256  # History points per game kept intact before the same buckets thin them
+
+def save_family(name):
+    """Game a save belongs to, for saves written before the game column existed."""
+    return "autosave" if name.startswith("autosave_") else name
+
+def expired_saves(rows, now):
+    """Names the retention policy drops. rows are (name, game, updated), grouped by game, newest first."""
+    expired = []
+    kept_per_game = collections.Counter()
+    buckets_seen = set()
+    for name, game, updated in rows:
+        if name == game:
+            continue  # The live save is never thinned
+        kept_per_game[game] += 1
+        if kept_per_game[game] <= RETENTION_KEEP_RECENT:
+            continue
+        age = now - updated
+        bucket_size = next(size for max_age, size in RETENTION_BUCKETS if max_age is None or age < max_age)
+        bucket = (game, bucket_size, int(updated // bucket_size))
+        if bucket in buckets_seen:
+            expired.append(name)
+        else:
+            buckets_seen.add(bucket)
+    return expired
+
+def thinned_history(rows, now):
+    """History points the retention policy drops from one game. rows are (seq, created), newest first."""
+    dropped = []
+    buckets_seen = set()
+    for count, (seq, created) in enumerate(rows):
+        if count < HISTORY_KEEP_RECENT:
+            continue
+        age = now - created
+        bucket_size = next(size for max_age, size in RETENTION_BUCKETS if max_age is None or age < max_age)
+        bucket = (bucket_size, int(created // bucket_size))
+        if bucket in buckets_seen:
+            dropped.append(seq)
+        else:
+            buckets_seen.add(bucket)
+    return dropped
+
+class SaveCatalog:
+    """Save storage plus in-memory metadata for the saved-games list.
+
+    The save count and the pages of the list are cached, and dropped only
+    when another connection has committed (PRAGMA data_version changes) or
+    we write through this one.
+    """
+    def __init__(self, path=SAVES_DB, legacy_path=LEGACY_SAVES_FILE, threaded=False):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.threaded = threaded
+        self.db = None
+        self.count = 0
+        self.pages = {}
+        self.stale = True
+        self.data_version = None
+
+    def connect(self):
+        if self.db is None:
+            self.db = sqlite3.connect(self.path, check_same_thread=not self.threaded)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=FULL")  # The journal is truncated once a save commits, so commits must be durable
+            version = self.db.execute("PRAGMA user_version").fetchone()[0]
+            if version < SAVES_SCHEMA_VERSION:
+                try:
+                    self.migrate_schema(version)
+                except Exception:
+                    self.close()  # Nothing was committed; the next connect retries the migration
+                    raise
+        return self.db
+
+    def migrate_schema(self, version):
+        # The legacy import commits with the version bump, so a failed import is retried next launch
+        legacy = self.read_legacy_file() if version < 1 else None
+        with self.db:
+            self.db.execute("BEGIN")
+            if version < 1:
+                self.db.execute("CREATE TABLE IF NOT EXISTS saves (name TEXT PRIMARY KEY, updated REAL NOT NULL, data TEXT NOT NULL)")
+            if version < 2:
+                self.db.execute("ALTER TABLE saves ADD COLUMN game TEXT")
+                self.db.create_function("save_family", 1, save_family)
+                self.db.execute("UPDATE saves SET game = save_family(name)")
+                self.db.execute("CREATE INDEX IF NOT EXISTS saves_by_updated ON saves (updated, name)")
+                self.db.execute("CREATE INDEX IF NOT EXISTS saves_by_game ON saves (game, updated)")
+            if version < 3:
+                self.db.execute("CREATE TABLE IF NOT EXISTS history (game TEXT NOT NULL, seq INTEGER NOT NULL, created REAL NOT NULL, "
+                                "action TEXT NOT NULL, kind INTEGER NOT NULL, data BLOB NOT NULL, PRIMARY KEY (game, seq))")
+            if legacy:
+                now = time.time()
+                self.db.executemany("INSERT OR REPLACE INTO saves (name, game, updated, data) VALUES (?, ?, ?, ?)",
+                                    [(name, save_family(name), now, encode_save_record(data)) for name, data in legacy.items()])
+            self.db.execute(f"PRAGMA user_version = {SAVES_SCHEMA_VERSION}")
+        if legacy is not None:
+            os.replace(self.legacy_path, self.legacy_path + ".migrated")
+            print(f"Migrated {len(legacy)} saves from {self.legacy_path} to {self.path}")
+
+    def read_legacy_file(self):
+        if not os.path.exists(self.legacy_path):
+            return None
+        with open(self.legacy_path, "r") as f:
+            return json.load(f)
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+        self.stale = True
+
+    def refresh(self):
+        """Drop the cached count and pages if the saves changed. Returns whether they did."""
+        db = self.connect()
+        data_version = db.execute("PRAGMA data_version").fetchone()[0]
+        if self.stale or data_version != self.data_version:
+            self.count = db.execute("SELECT COUNT(*) FROM saves").fetchone()[0]
+            self.pages.clear()
+            self.stale = False
+            self.data_version = data_version
+            return True
+        return False
 
-def get_saved_games():
-    all_saves = load_all_saves()
-    return sorted(all_saves.keys(), reverse=True)
+    def page(self, offset, limit):
+        """(name, updated) rows for one screenful of the newest-first list."""
+        self.refresh()
+        key = (offset, limit)
+        if key not in self.pages:
+            self.pages[key] = self.db.execute("SELECT name, updated FROM saves ORDER BY updated DESC, name DESC LIMIT ? OFFSET ?",
+                                              (limit, offset)).fetchall()
+        return self.pages[key]
+
+    def load(self, name):
+        row = self.connect().execute("SELECT data FROM saves WHERE name = ?", (name,)).fetchone()
+        return None if row is None else decode_save_record(row[0])
+
+    def put(self, name, data, game=None):
+        self.put_many([(name, data, game)])
+
+    def put_many(self, items):
+        db = self.connect()
+        now = time.time()
+        rows = [(name, game or save_family(name), now, encode_save_record(data)) for name, data, game in items]
+        with db:
+            db.executemany("INSERT OR REPLACE INTO saves (name, game, updated, data) VALUES (?, ?, ?, ?)", rows)
+        self.stale = True
+
+    def convert_json_rows(self, batch_size=500):
+        """Re-encode rows still stored as JSON text in the binary format. Returns how many changed."""
+        db = self.connect()
+        converted = 0
+        last_name = ""
+        while True:
+            rows = db.execute("SELECT name, data FROM saves WHERE typeof(data) = 'text' AND name > ? ORDER BY name LIMIT ?",
+                              (last_name, batch_size)).fetchall()
+            if not rows:
+                return converted
+            last_name = rows[-1][0]
+            records = [(encode_save_record(json.loads(text)), name) for name, text in rows]
+            records = [(record, name) for record, name in records if isinstance(record, bytes)]
+            with db:
+                db.executemany("UPDATE saves SET data = ? WHERE name = ?", records)
+            converted += len(records)
+            self.stale = True
+
+    def delete(self, name):
+        db = self.connect()
+        with db:
+            deleted = db.execute("DELETE FROM saves WHERE name = ?", (name,)).rowcount
+        self.stale = True
+        return deleted > 0
+
+    def compact(self, now=None):
+        """Apply the retention policy to saves and history and drop history of deleted games. Returns how many saves were dropped."""
+        db = self.connect()
+        now = time.time() if now is None else now
+        rows = db.execute("SELECT name, game, updated FROM saves ORDER BY game, updated DESC")
+        expired = expired_saves(rows, now)
+        with db:
+            db.executemany("DELETE FROM saves WHERE name = ?", ((name,) for name in expired))
+            orphaned = db.execute("DELETE FROM history WHERE game NOT IN (SELECT name FROM saves)").rowcount
+        thinned = 0
+        for (game,) in db.execute("SELECT game FROM history GROUP BY game HAVING COUNT(*) > ?", (HISTORY_KEEP_RECENT,)).fetchall():
+            thinned += self.thin_history(game, now)
+        if expired or orphaned or thinned:
+            db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.stale = True
+        return len(expired)
+
+    def thin_history(self, game, now):
+        """Drop the points thinned_history picks from one game's history. A kept delta whose
+        chain back to its base lost a point is rewritten as a base first. Returns how many points were dropped."""
+        db = self.connect()
+        points = db.execute("SELECT seq, created, kind FROM history WHERE game = ? ORDER BY seq DESC", (game,)).fetchall()
+        dropped = set(thinned_history([(seq, created) for seq, created, kind in points], now))
+        if not dropped:
+            return 0
+        rebased = []
+        broken = False
+        for seq, created, kind in reversed(points):
+            if seq in dropped:
+                broken = True
+            elif kind == HISTORY_BASE:
+                broken = False
+            elif broken:
+                rebased.append((HISTORY_BASE, encode_save_record(self.history_state(game, seq)), game, seq))
+                broken = False
+        with db:
+            db.executemany("UPDATE history SET kind = ?, data = ? WHERE game = ? AND seq = ?", rebased)
+            db.executemany("DELETE FROM history WHERE game = ? AND seq = ?", ((game, seq) for seq in dropped))
+        return len(dropped)
+
+    def append_history(self, entries):
+        db = self.connect()
+        with db:
+            db.executemany("INSERT INTO history (game, seq, created, action, kind, data) VALUES (?, ?, ?, ?, ?, ?)", entries)
+
+    def history_head(self, game):
+        return self.connect().execute("SELECT COALESCE(MAX(seq), 0) FROM history WHERE game = ?", (game,)).fetchone()[0]
+
+    def history(self, game, limit=50):
+        """Newest-first (seq, created, action) points in a game's history."""
+        return self.connect().execute("SELECT seq, created, action FROM history WHERE game = ? ORDER BY seq DESC LIMIT ?",
+                                      (game, limit)).fetchall()
+
+    def history_state(self, game, seq):
+        """Rebuild the game as of history point seq: the nearest base at or before it plus the deltas after that base."""
+        db = self.connect()
+        base = db.execute("SELECT MAX(seq) FROM history WHERE game = ? AND kind = ? AND seq <= ?", (game, HISTORY_BASE, seq)).fetchone()[0]
+        if base is None:
+            return None
+        state = None
+        for kind, data in db.execute("SELECT kind, data FROM history WHERE game = ? AND seq BETWEEN ? AND ? ORDER BY seq", (game, base, seq)):
+            state = decode_save_record(data) if kind == HISTORY_BASE else apply_merge_patch(state, json.loads(data))
+        return state
+
+save_catalog = SaveCatalog()
+
+# Write-ahead action journal: every state-changing action appends the merge patch it
+# caused, so a crash loses at most the last action instead of everything since the
+# last snapshot. Lines are flushed to the OS immediately and fsynced in batches by
+# the save writer; entries at or below a game's snapshot journal_seq are dropped.
+JOURNAL_FILE = "saves.journal"
+JOURNAL_SYNC_INTERVAL = 1.0  # Seconds between batched fsyncs
+
+class ActionJournal:
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.file = None
+        self.seq = 0
+        self.games = set()  # Games with entries in the file
+        self.unsynced = False
+        self.lock = threading.Lock()  # Guards the file and counters; held only briefly, since append() runs on the render thread
+        self.truncate_lock = threading.Lock()  # One truncate at a time
+
+    def read_entries(self, end=None):
+        """Entries in the file, or in its first end bytes."""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "rb") as f:
+            data = f.read() if end is None else f.read(end)
+        entries = []
+        for line in data.splitlines():
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                break  # A torn final line from a crash mid-append
+        return entries
+
+    def open(self):
+        if self.file is None:
+            entries = self.read_entries()
+            self.seq = max([self.seq] + [entry["seq"] for entry in entries])
+            self.games = {entry["game"] for entry in entries}
+            self.rewrite(entries)  # Drops any torn tail before we append after it
+        return self.file
+
+    def write_entries(self, path, entries):
+        with open(path, "w") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def rewrite(self, entries):
+        temp_path = self.path + ".tmp"
+        self.write_entries(temp_path, entries)
+        if self.file is not None:
+            self.file.close()
+        os.replace(temp_path, self.path)
+        self.file = open(self.path, "a")
+
+    def advance(self, seq):
+        """Never hand out a sequence number at or below one a loaded snapshot already covers."""
+        with self.lock:
+            self.open()
+            self.seq = max(self.seq, seq)
+
+    def append(self, game, action, patch):
+        with self.lock:
+            self.open()
+            self.seq += 1
+            self.file.write(json.dumps({"seq": self.seq, "game": game, "action": action, "patch": patch}) + "\n")
+            self.file.flush()
+            self.games.add(game)
+            self.unsynced = True
+            return self.seq
+
+    def sync(self):
+        # fsync a duplicate descriptor outside the lock, so append() never waits on the disk
+        with self.lock:
+            if not self.unsynced or self.file is None:
+                return
+            fd = os.dup(self.file.fileno())
+            self.unsynced = False
+        try:
+            os.fsync(fd)
+        except OSError:
+            with self.lock:
+                self.unsynced = True
+            raise
+        finally:
+            os.close(fd)
+
+    def entries_after(self, game, seq):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+            return [entry for entry in self.read_entries() if entry["game"] == game and entry["seq"] > seq]
+
+    def truncate(self, game, seq):
+        """Drop the game's entries that a durable snapshot at journal_seq seq already contains.
+
+        The kept entries are written and fsynced before taking the lock; under it
+        only the lines appended meanwhile are copied over and the file swapped in.
+        """
+        with self.truncate_lock:
+            with self.lock:
+                if game not in self.games:
+                    return
+                self.open()
+                self.file.flush()
+                end = self.file.tell()
+            entries = self.read_entries(end)
+            kept = [entry for entry in entries if entry["game"] != game or entry["seq"] > seq]
+            temp_path = self.path + ".tmp"
+            if len(kept) < len(entries):
+                self.write_entries(temp_path, kept)
+            with self.lock:
+                if self.file is not None:
+                    self.file.flush()
+                with open(self.path, "rb") as f:
+                    f.seek(end)
+                    tail = f.read()
+                self.games = {entry["game"] for entry in kept + [json.loads(line) for line in tail.splitlines()]}
+                if len(kept) < len(entries):
+                    with open(temp_path, "ab") as f:
+                        f.write(tail)
+                    if self.file is not None:
+                        self.file.close()
+                    os.replace(temp_path, self.path)
+                    self.file = open(self.path, "a")
+                    self.unsynced = bool(tail)
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+journal = ActionJournal()
+
+class SaveWriter:
+    """Writes save snapshots on a background thread so the render loop never waits on disk.
+
+    Each write is one SQLite transaction, so a crash mid-write leaves the
+    previous version of every save intact. Requests for a game that is still
+    queued replace the queued snapshot instead of adding another write.
+    The writer also
+    fsyncs the action journal in batches and truncates it behind each snapshot.
+    """
+    def __init__(self, path=SAVES_DB, journal=journal):
+        self.catalog = SaveCatalog(path, threaded=True)
+        self.journal = journal
+        self.pending = {}
+        self.in_flight = {}  # The batch being written; still readable until it commits
+        self.history = []
+        self.history_heads = {}  # game -> last history seq written; only touched on the writer thread
+        self.compaction_requested = False
+        self.writing = False
+        self.stopping = False
+        self.errors = collections.deque()
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def start(self):
+        self.catalog.connect()  # Open (and migrate) on the calling thread, before the writer exists
+        self.stopping = False
+        self.thread = threading.Thread(target=self.run, name="save-writer", daemon=True)
+        self.thread.start()
+
+    def ensure_running(self):
+        if self.thread is None:
+            self.start()
+
+    def submit(self, name, snapshot, game=None):
+        self.ensure_running()
+        with self.condition:
+            self.pending[name] = (snapshot, game)
+            self.condition.notify_all()
+
+    def append_history(self, game, action, kind, payload):
+        self.ensure_running()
+        with self.condition:
+            self.history.append((game, time.time(), action, kind, payload))
+            self.condition.notify_all()
+
+    def request_compaction(self):
+        """Apply the retention policy on the writer thread after any queued writes."""
+        self.ensure_running()
+        with self.condition:
+            self.compaction_requested = True
+            self.condition.notify_all()
+
+    def pending_snapshot(self, name):
+        with self.condition:
+            queued = self.pending.get(name) or self.in_flight.get(name)
+        return queued[0] if queued else None
+
+    def flush(self, timeout=None):
+        """Block until every queued snapshot and compaction is done (or has failed)."""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending and not self.history and not self.compaction_requested and not self.writing, timeout)
+
+    def stop(self):
+        if self.thread is None:
+            return
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        self.thread.join()
+        self.thread = None
+        self.catalog.close()
+        self.journal.sync()
+
+    def poll_error(self):
+        return self.errors.popleft() if self.errors else None
+
+    def write_batch(self, batch, history, compact):
+        try:
+            self.journal.sync()
+        except OSError as e:
+            self.errors.append(f"Journal sync failed: {e}")
+        if history:
+            try:
+                rows = []
+                for game, created, action, kind, payload in history:
+                    # Numbered here, where every earlier point for the game is already written
+                    if game not in self.history_heads:
+                        self.history_heads[game] = self.catalog.history_head(game)
+                    self.history_heads[game] += 1
+                    rows.append((game, self.history_heads[game], created, action, kind, payload))
+                self.catalog.append_history(rows)
+            except Exception as e:
+                self.history_heads.clear()  # Re-read the heads rather than trust numbers that weren't written
+                self.errors.append(f"History write failed: {e}")
+        for name, (snapshot, game) in batch.items():
+            try:
+                self.catalog.put(name, snapshot, game)
+            except Exception as e:
+                self.errors.append(f"Save failed: {e}")
+                continue
+            print(f"Game saved as {name}")
+            try:
+                self.journal.truncate(name, snapshot.get("journal_seq", 0))
+            except OSError as e:
+                self.errors.append(f"Journal truncate failed: {e}")
+        if compact:
+            try:
+                converted = self.catalog.convert_json_rows()
+                if converted:
+                    print(f"Converted {converted} saves to the binary format")
+                dropped = self.catalog.compact()
+                if dropped:
+                    print(f"Compaction dropped {dropped} old saves")
+            except Exception as e:
+                self.errors.append(f"Compaction failed: {e}")
+
+    def run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or self.history or self.compaction_requested or self.stopping, JOURNAL_SYNC_INTERVAL)
+                batch, self.pending = self.pending, {}
+                self.in_flight = batch
+                history, self.history = self.history, []
+                compact, self.compaction_requested = self.compaction_requested, False
+                self.writing = bool(batch or history) or compact
+                stopping = self.stopping
+            try:
+                self.write_batch(batch, history, compact)
+            finally:
+                with self.condition:
+                    self.in_flight = {}
+                    self.writing = False
+                    self.condition.notify_all()
+            if stopping and not batch and not history and not compact:
+                return
+
+save_writer = SaveWriter()
+
+# Saved-games list: only the rows in view are queried and drawn
+SAVED_GAMES_VISIBLE = 8
+SAVED_GAMES_ROW_HEIGHT = 60
+saved_games_scroll = 0
+saved_games_drawn_scroll = None  # Scroll offset of the page last pushed to the display
+SAVED_GAMES_SCROLL_KEYS = {pygame.K_UP: -1, pygame.K_DOWN: 1, pygame.K_PAGEUP: -SAVED_GAMES_VISIBLE, pygame.K_PAGEDOWN: SAVED_GAMES_VISIBLE}
+
+def get_saved_games(offset=0, limit=SAVED_GAMES_VISIBLE):
+    """Newest-first (name, updated) rows for one page of the saved-games list."""
+    return save_catalog.page(offset, limit)
+
+def scroll_saved_games(rows):
+    global saved_games_scroll
+    save_catalog.refresh()
+    max_scroll = max(0, save_catalog.count - SAVED_GAMES_VISIBLE)
+    saved_games_scroll = max(0, min(saved_games_scroll + rows, max_scroll))
+
+def saved_game_rects(row):
+    y = 150 + row * SAVED_GAMES_ROW_HEIGHT
+    return pygame.Rect(width // 2 - 150, y, 250, 50), pygame.Rect(width // 2 + 110, y, 50, 50)
+
+def export_saves_json(path, names=None):
+    """Decode saves (all of them by default) into one readable JSON file, for debugging."""
+    save_writer.flush()
+    db = save_catalog.connect()
+    if names is None:
+        names = [row[0] for row in db.execute("SELECT name FROM saves ORDER BY name")]
+    with open(path, "w") as f:
+        json.dump({name: save_catalog.load(name) for name in names}, f, indent=2, sort_keys=True)
+    print(f"Exported {len(names)} saves to {path}")
 
 def delete_game(game_name):
-    all_saves = load_all_saves()
-    
-    if game_name in all_saves:
-        del all_saves[game_name]
-        with open("all_saves.json", "w") as f:
-            json.dump(all_saves, f)
+    save_writer.flush()  # A queued write must not resurrect the save after we delete it
+    persisted_snapshots.pop(game_name, None)
+    journal.truncate(game_name, journal.seq)
+    with save_catalog.connect():
+        save_catalog.db.execute("DELETE FROM history WHERE game = ?", (game_name,))
+    if save_catalog.delete(game_name):
         print(f"Deleted save: {game_name}")
         return True
     else:
@@ -1330,31 +3096,49 @@ def delete_game(game_name):
         return False
 
 def draw_saved_games_screen():
+    global saved_games_drawn_scroll
     screen.fill((0, 0, 0))
-    font = pygame.font.Font(None, 36)
-    saved_games = get_saved_games()
-    
-    title_text = font.render("Select a Saved Game or Start a New Game", True, (255, 255, 255))
+    font = get_font(36)
+    small_font = get_font(20)
+    changed = save_catalog.refresh()  # The writer's commits and compaction land here
+    scroll_saved_games(0)  # Re-clamp in case saves were deleted or compacted
+    saved_games = get_saved_games(saved_games_scroll)
+    if changed or saved_games_scroll != saved_games_drawn_scroll:
+        request_full_redraw()  # Nothing on this screen marks dirty rects, so push the whole list
+        saved_games_drawn_scroll = saved_games_scroll
+    
+    title_text = render_text(font, "Select a Saved Game or Start a New Game", (255, 255, 255))
     screen.blit(title_text, (width // 2 - 200, 50))
     
-    for i, game in enumerate(saved_games):
-        if i >= 5:  # Limit to displaying only the 5 most recent saves
-            break
+    for i, (game, updated) in enumerate(saved_games):
         display_text = game[:20] + "..." if len(game) > 20 else game  # Truncate long names
-        game_rect = pygame.Rect(width // 2 - 150, 150 + i * 60, 250, 50)
+        game_rect, delete_rect = saved_game_rects(i)
         pygame.draw.rect(screen, (0, 255, 0), game_rect)
-        game_text = font.render(display_text, True, (0, 0, 0))
-        screen.blit(game_text, (width // 2 - 140, 160 + i * 60))
+        game_text = render_text(font, display_text, (0, 0, 0))
+        screen.blit(game_text, (game_rect.x + 10, game_rect.y + 10))
 
         # Add delete button
-        delete_rect = pygame.Rect(width // 2 + 110, 150 + i * 60, 50, 50)
         pygame.draw.rect(screen, (255, 0, 0), delete_rect)
-        delete_text = font.render("X", True, (0, 0, 0))
-        screen.blit(delete_text, (width // 2 + 130, 160 + i * 60))
+        delete_text = render_text(font, "X", (0, 0, 0))
+        screen.blit(delete_text, (delete_rect.x + 20, delete_rect.y + 10))
+
+        date_text = render_text(small_font, datetime.datetime.fromtimestamp(updated).strftime("%Y-%m-%d %H:%M"), (180, 180, 180))
+        screen.blit(date_text, (delete_rect.right + 10, delete_rect.y + 17))
+
+    # Scrollbar and position, once the list outgrows the screen
+    total = save_catalog.count
+    if total > SAVED_GAMES_VISIBLE:
+        track = pygame.Rect(width - 60, 150, 8, SAVED_GAMES_VISIBLE * SAVED_GAMES_ROW_HEIGHT - 10)
+        pygame.draw.rect(screen, (60, 60, 60), track)
+        thumb_height = max(20, track.height * SAVED_GAMES_VISIBLE // total)
+        thumb_y = track.y + (track.height - thumb_height) * saved_games_scroll // (total - SAVED_GAMES_VISIBLE)
+        pygame.draw.rect(screen, (0, 255, 0), (track.x, thumb_y, track.width, thumb_height))
+        position_text = render_text(small_font, f"{saved_games_scroll + 1}-{saved_games_scroll + len(saved_games)} of {total}  (scroll for more)", (180, 180, 180))
+        screen.blit(position_text, position_text.get_rect(center=(width // 2, 150 + SAVED_GAMES_VISIBLE * SAVED_GAMES_ROW_HEIGHT + 5)))
     
     new_game_rect = pygame.Rect(width // 2 - 100, height - 100, 200, 50)
     pygame.draw.rect(screen, (0, 255, 0), new_game_rect)
-    new_game_text = font.render("New Game", True, (0, 0, 0))
+    new_game_text = render_text(font, "New Game", (0, 0, 0))
     screen.blit(new_game_text, (width // 2 - 60, height - 90))
     
 def create_new_game():
@@ -1372,8 +3156,8 @@ def draw_confirmation_dialog(message):
     dialog_rect = pygame.Rect(width // 2 - 150, height // 2 - 75, 300, 150)
     pygame.draw.rect(screen, (200, 200, 200), dialog_rect)
     
-    font = pygame.font.Font(None, 24)
-    text_surface = font.render(message, True, (0, 0, 0))
+    font = get_font(24)
+    text_surface = render_text(font, message, (0, 0, 0))
     text_rect = text_surface.get_rect(center=(width // 2, height // 2 - 25))
     screen.blit(text_surface, text_rect)
     
@@ -1383,8 +3167,8 @@ def draw_confirmation_dialog(message):
     pygame.draw.rect(screen, (0, 255, 0), yes_button)
     pygame.draw.rect(screen, (255, 0, 0), no_button)
     
-    yes_text = font.render("Yes", True, (0, 0, 0))
-    no_text = font.render("No", True, (0, 0, 0))
+    yes_text = render_text(font, "Yes", (0, 0, 0))
+    no_text = render_text(font, "No", (0, 0, 0))
     
     screen.blit(yes_text, (width // 2 - 80, height // 2 + 35))
     screen.blit(no_text, (width // 2 + 40, height // 2 + 35))
@@ -1402,8 +3186,20 @@ def handle_confirmation_dialog(x, y, message, yes_action):
     
     return False
 
-# Main game loop
-running = True
+# Frame pacing state
+INPUT_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL, pygame.MOUSEMOTION)
+pacing = dict(DEFAULT_PACING)
+pacing_idle = False
+
+def is_animating():
+    """True while anything on screen moves on its own: the egg, the reels or a notification."""
+    if spinning or overlays.busy():
+        return True
+    if current_screen == "title":
+        return True
+    return current_screen == "main_game" and not creature_displayed
+
+# Screen state
 current_screen = "title"
 game_states = ["title", "element_selection", "main_game", "slot_machine", "element_purchase", "feeding", "saved_games", "lab"]
 creature_displayed = False
@@ -1414,104 +3210,16 @@ def check_and_evolve_on_startup():
     if egg_level >= 10 and not creature_displayed:
         hatch_creature()
 
-# Run this check at the start of the game
-check_and_evolve_on_startup()
-
-# Initialize music
-music_on, current_theme = load_music_preference()
-start_theme_song()
-
-clock = pygame.time.Clock()
-fps = 30  # Set to 30 FPS
-
-while running:
-    dt = clock.tick(fps) / 1000.0  # Get time since last frame in seconds
-    current_fps = clock.get_fps()
-
-    button_down = False
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_m:
-                toggle_music()
-            elif event.key == pygame.K_t:
-                switch_theme()
-            elif event.key == pygame.K_F3:  # Toggle debug mode with F3 key
-                debug_mode = not debug_mode
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            x, y = event.pos
-            print(f"Mouse clicked at: ({x}, {y})")
-            if current_screen == "main_game":
-                for button in buttons:
-                    if button["rect"].collidepoint(x, y):
-                        handle_button_click(button["label"])
-            elif current_screen == "title":
-                if start_button["rect"].collidepoint(x, y):
-                    current_screen = "saved_games"
-            elif current_screen == "saved_games":
-                if confirming_delete:
-                    if handle_confirmation_dialog(x, y, f"Delete save {game_to_delete}?", lambda: delete_game(game_to_delete)):
-                        confirming_delete = False
-                        game_to_delete = None
-                else:
-                    saved_games = get_saved_games()
-                    for i, game in enumerate(saved_games):
-                        if i >= 5:  # Limit to checking only the 5 most recent saves
-                            break
-                        game_rect = pygame.Rect(width // 2 - 150, 150 + i * 60, 250, 50)
-                        delete_rect = pygame.Rect(width // 2 + 110, 150 + i * 60, 50, 50)
-                        if game_rect.collidepoint(x, y):
-                            if load_game(game):
-                                current_screen = "main_game"
-                        elif delete_rect.collidepoint(x, y):
-                            confirming_delete = True
-                            game_to_delete = game
-                    new_game_rect = pygame.Rect(width // 2 - 100, height - 100, 200, 50)
-                    if new_game_rect.collidepoint(x, y):
-                        create_new_game()
-            elif current_screen == "element_selection":
-                if handle_element_selection(x, y):
-                    continue
-                if confirm_button.collidepoint(x, y) and len(selected_elements) == max_elements:
-                    current_screen = "main_game"
-            elif current_screen == "lab":
-                if event.button == 1:  # Left click
-                    handle_lab_interaction(event.pos[0], event.pos[1])
-                elif event.button == 3:  # Right click
-                    handle_lab_interaction(event.pos[0], event.pos[1], right_click=True)
-            elif current_screen == "slot_machine":
-                if spin_button.collidepoint(x, y) and not spinning and tokens > 0:
-                    tokens -= 1
-                    spin_reels()
-                elif back_button.collidepoint(x, y):
-                    current_screen = "main_game"
-            elif current_screen == "element_purchase":
-                handle_element_purchase(x, y, button_down)
-            elif current_screen == "feeding":
-                handle_feeding_selection(x, y, button_down)
-                check_egg_evolution()  # Ensure this is called after feeding
-        elif event.type == pygame.MOUSEBUTTONUP:
-            button_down = False
-        elif event.type == pygame.MOUSEWHEEL:
-            x, y = pygame.mouse.get_pos()
-            if current_screen == "element_purchase":
-                if event.y > 0:
-                    handle_element_purchase(x, y, True)
-                else:
-                    handle_element_purchase(x, y, False)
-            elif current_screen == "feeding":
-                if event.y > 0:
-                    handle_feeding_selection(x, y, True)
-                else:
-                    handle_feeding_selection(x, y, False)
-                
-    screen.fill((0, 0, 0))  # Clear screen with black background
-
-    # Update egg creature based on time passed
-    egg_creature.rotation += egg_creature.rotation_speed * dt * 60  # Multiply by 60 to maintain similar speed at lower FPS
-    egg_creature.update()
+def init_game(headless=False):
+    """Open the window and load sounds. Headless skips audio so it runs under SDL's dummy drivers."""
+    global screen
+    pygame.init()
+    if not headless:
+        pygame.mixer.init()
+        load_sounds()
+    screen = pygame.display.set_mode((width, height))
 
+def draw_current_screen(dt):
     if current_screen == "title":
         draw_title_screen()
     elif current_screen == "saved_games":
@@ -1523,7 +3231,8 @@ while running:
     elif current_screen == "slot_machine":
         draw_slot_machine()
         if spinning:
-            update_spinning_reels()
+            mark_dirty((60, 100, 780, 400))  # Reel windows
+            update_spinning_reels(dt)
     elif current_screen == "element_purchase":
         draw_element_purchase_screen()
     elif current_screen == "feeding":
@@ -1533,11 +3242,165 @@ while running:
     elif current_screen == "main_game":
         draw_main_game_screen()
 
-    draw_debug_overlay(current_fps)  # Draw debug information
-    
-    autosave_game()
-    
-    pygame.display.flip()
+def update_and_draw_frame(dt, fps):
+    screen.fill((0, 0, 0))  # Clear screen with black background
 
-pygame.quit()
-sys.exit()
\ No newline at end of file
+    # Update egg creature based on time passed
+    egg_creature.rotation += egg_creature.rotation_speed * dt * 60  # Multiply by 60 to maintain similar speed at lower FPS
+    egg_creature.update()
+    frame_profiler.mark("egg_update")
+
+    draw_current_screen(dt)
+    overlays.update(dt)
+    for rect in overlays.draw(screen):
+        mark_dirty(rect)
+    draw_debug_overlay(fps)  # Draw debug information
+    frame_profiler.mark("draw")
+
+def main():
+    global music_on, current_theme, debug_mode, current_screen, confirming_delete, game_to_delete, tokens, pacing, pacing_idle
+    init_game()
+    load_assets()
+    build_synthesis_planner(background=True)
+    if EGG_ATLAS_ENABLED:
+        egg_creature.bake_atlas(background=True)
+
+    # Run this check at the start of the game
+    check_and_evolve_on_startup()
+    save_writer.request_compaction()  # Thin old saves in the background
+
+    # Initialize music
+    music_on, current_theme = load_music_preference()
+    start_theme_song()
+
+    pacing = load_pacing_preference()
+    clock = pygame.time.Clock()
+    presented_screen = None
+    running = True
+    last_input_time = time.time()
+
+    while running:
+        pacing_idle = not is_animating() and time.time() - last_input_time >= pacing["idle_timeout"]
+        if pacing_idle:
+            # Sleep in SDL until input arrives or the low-rate tick is due
+            event = pygame.event.wait(int(1000 / pacing["min_fps"]))
+            events = ([event] if event.type != pygame.NOEVENT else []) + pygame.event.get()
+            dt = clock.tick() / 1000.0
+        else:
+            dt = clock.tick(pacing["max_fps"]) / 1000.0  # Get time since last frame in seconds
+            events = pygame.event.get()
+        current_fps = clock.get_fps()
+        frame_profiler.begin_frame()
+
+        button_down = False
+        for event in events:
+            if event.type in INPUT_EVENTS:
+                last_input_time = time.time()
+            if event.type in FULL_REDRAW_EVENTS:
+                request_full_redraw()
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_m:
+                    toggle_music()
+                elif event.key == pygame.K_t:
+                    switch_theme()
+                elif event.key == pygame.K_F3:  # Toggle debug mode with F3 key
+                    debug_mode = not debug_mode
+                elif event.key == pygame.K_F4:  # Dump recent frame timings
+                    dump_frame_timings()
+                elif current_screen == "saved_games" and event.key in SAVED_GAMES_SCROLL_KEYS:
+                    scroll_saved_games(SAVED_GAMES_SCROLL_KEYS[event.key])
+            elif event.type == pygame.MOUSEMOTION:
+                update_hovered_tile(event.pos)
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                x, y = event.pos
+                print(f"Mouse clicked at: ({x}, {y})")
+                if current_screen == "main_game":
+                    for button in buttons:
+                        if button["rect"].collidepoint(x, y):
+                            handle_button_click(button["label"])
+                elif current_screen == "title":
+                    if start_button["rect"].collidepoint(x, y):
+                        current_screen = "saved_games"
+                elif current_screen == "saved_games":
+                    if confirming_delete:
+                        if handle_confirmation_dialog(x, y, f"Delete save {game_to_delete}?", lambda: delete_game(game_to_delete)):
+                            confirming_delete = False
+                            game_to_delete = None
+                    else:
+                        for i, (game, _) in enumerate(get_saved_games(saved_games_scroll)):
+                            game_rect, delete_rect = saved_game_rects(i)
+                            if game_rect.collidepoint(x, y):
+                                if load_game(game):
+                                    current_screen = "main_game"
+                            elif delete_rect.collidepoint(x, y):
+                                confirming_delete = True
+                                game_to_delete = game
+                        new_game_rect = pygame.Rect(width // 2 - 100, height - 100, 200, 50)
+                        if new_game_rect.collidepoint(x, y):
+                            create_new_game()
+                elif current_screen == "element_selection":
+                    if handle_element_selection(x, y):
+                        continue
+                    if confirm_button.collidepoint(x, y) and len(selected_elements) == max_elements:
+                        current_screen = "main_game"
+                elif current_screen == "lab":
+                    if event.button == 1:  # Left click
+                        handle_lab_interaction(event.pos[0], event.pos[1])
+                    elif event.button == 3:  # Right click
+                        handle_lab_interaction(event.pos[0], event.pos[1], right_click=True)
+                elif current_screen == "slot_machine":
+                    if spin_button.collidepoint(x, y) and not spinning and tokens > 0:
+                        tokens -= 1
+                        spin_reels()
+                    elif back_button.collidepoint(x, y):
+                        current_screen = "main_game"
+                elif current_screen == "element_purchase":
+                    handle_element_purchase(x, y, button_down)
+                elif current_screen == "feeding":
+                    handle_feeding_selection(x, y, button_down)
+                    check_egg_evolution()  # Ensure this is called after feeding
+            elif event.type == pygame.MOUSEBUTTONUP:
+                button_down = False
+            elif event.type == pygame.MOUSEWHEEL:
+                x, y = pygame.mouse.get_pos()
+                if current_screen == "saved_games" and not confirming_delete:
+                    scroll_saved_games(-event.y)
+                elif current_screen == "element_purchase":
+                    if event.y > 0:
+                        handle_element_purchase(x, y, True)
+                    else:
+                        handle_element_purchase(x, y, False)
+                elif current_screen == "feeding":
+                    if event.y > 0:
+                        handle_feeding_selection(x, y, True)
+                    else:
+                        handle_feeding_selection(x, y, False)
+                    
+        frame_profiler.mark("events")
+        update_and_draw_frame(dt, current_fps)
+        
+        autosave_game()
+        save_error = save_writer.poll_error()
+        if save_error:
+            print(save_error)
+            overlays.push(save_error, (255, 60, 60), 36, 4.0)
+        frame_profiler.mark("autosave")
+
+        if current_screen != presented_screen:
+            request_full_redraw()  # Screen transitions always get a full flip
+            presented_screen = current_screen
+        present_frame()
+        frame_profiler.mark("flip")
+        frame_profiler.end_frame()
+
+    save_writer.stop()  # Let queued saves finish before exiting
+    pygame.quit()
+    sys.exit()
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "--export-saves":  # python ELEMENTEGG.py --export-saves out.json [name ...]
+        export_saves_json(sys.argv[2], sys.argv[3:] or None)
+    else:
+        main()
@@ -0,0 +1,472 @@
+"""Headless frame-time benchmarks for ELEMENTEGG.
+
+Every screen is drawn under SDL's dummy video and audio drivers with synthetic
+game state at three sizes (empty, typical, stress). The report gives mean, p95
+and p99 frame times plus peak allocations per frame. Results are compared
+against a saved baseline, and any p95 regression makes the run exit non-zero.
+
+    python benchmark.py                    # compare against benchmark_baseline.json
+    python benchmark.py --save-baseline    # record a new baseline
+    python benchmark.py --screens lab --sizes stress
+    python benchmark.py --save-latency     # save_game() cost from 10 to 10,000 saves
+    python benchmark.py --save-format      # JSON vs binary save size and decode time
+    python benchmark.py --combine          # combine_elements() cost from 1,000 to 100,000 compounds
+    python benchmark.py --craft            # lab hint query and update cost from 1,000 to 50,000 compounds
+    python benchmark.py --synthesis        # cheapest multi-step synthesis over a 50,000-compound recipe graph
+    python benchmark.py --stream 500       # json.load vs the streaming loader on a generated 500 MB compounds.json
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import ELEMENTEGG as game
+
+SCREENS = ["title", "saved_games", "element_selection", "main_game", "slot_machine", "element_purchase", "feeding", "lab"]
+SIZES = ["empty", "typical", "stress"]
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+FRAME_DT = 1 / 30
+SAVE_LATENCY_COUNTS = [10, 100, 1000, 10000]
+COMBINE_COUNTS = [1000, 10000, 100000]
+CRAFT_COUNTS = [1000, 10000, 50000]
+SYNTHESIS_COUNTS = [5000, 50000]
+
+SYMBOLS = game.ELEMENT_SYMBOLS
+
+WORDS = ("the compound forms crystalline lattice structures under standard conditions and reacts with "
+         "water acids bases releasing heat used industrially in fertilizers ceramics glass pigments "
+         "polytetrafluoroethylene hexamethylenetetramine").split()
+
+def synthetic_elements(rng):
+    return [
+        {"symbol": symbol, "name": f"Element {symbol}", "atomic_weight": round((i + 1) * 2.014, 3),
+         "color": [rng.randint(0, 255) for _ in range(3)]}
+        for i, symbol in enumerate(SYMBOLS)
+    ]
+
+def synthetic_sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def synthetic_compounds(rng, count, description_words=20, pool=SYMBOLS[:30]):
+    compounds = []
+    for i in range(count):
+        symbols = rng.sample(pool, rng.randint(2, 3))
+        formula = "".join(symbol + (str(rng.randint(2, 4)) if rng.random() < 0.5 else "") for symbol in symbols)
+        compounds.append({
+            "name": f"Compound {i}",
+            "formula": formula,
+            "elements": symbols,
+            "description": synthetic_sentence(rng, description_words),
+            "trivia": synthetic_sentence(rng, max(5, description_words // 3)),
+        })
+    return compounds
+
+def synthetic_save(rng, symbols):
+    return {
+        "ore_chunks": rng.randint(0, 9999),
+        "selected_elements": symbols,
+        "element_quantities": {symbol: rng.randint(0, 500) for symbol in symbols},
+        "egg_level": rng.randint(1, 9),
+        "growth_level": rng.randint(0, 49),
+        "tokens": rng.randint(0, 100),
+        "lifetime_fed": {symbol: (rng.randint(0, 500) if symbol in symbols else 0) for symbol in SYMBOLS},
+        "music_on": True,
+        "current_theme": game.THEME_SONG_1,
+    }
+
+def write_saves(rng, count):
+    """Replace the save database with count synthetic saves."""
+    game.save_writer.stop()
+    game.save_catalog.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(game.SAVES_DB + suffix):
+            os.remove(game.SAVES_DB + suffix)
+    game.save_catalog.put_many((f"game_20240101_{i:06d}", synthetic_save(rng, rng.sample(SYMBOLS, 3)), None) for i in range(count))
+
+def apply_state(size):
+    """Reset the game module to a synthetic state of the given size."""
+    rng = random.Random(size)
+    compound_count, save_count = {"empty": (0, 0), "typical": (200, 20), "stress": (5000, 50000)}[size]
+    description_words = 300 if size == "stress" else 20
+    game.set_element_data(synthetic_elements(rng), synthetic_compounds(rng, compound_count, description_words))
+    write_saves(rng, save_count)
+
+    game.selected_elements = [] if size == "empty" else rng.sample(game.elements, game.max_elements)
+    game.element_quantities = {e["symbol"]: (0 if size == "empty" else rng.randint(0, 999)) for e in game.selected_elements}
+    game.element_purchase_quantities.update({symbol: 0 for symbol in game.element_quantities})
+    game.feeding_quantities = {symbol: 0 for symbol in game.element_quantities}
+    for symbol in game.element_quantities:
+        game.lifetime_fed[symbol] = rng.randint(0, 999) if size != "empty" else 0
+    game.enlarged_element = game.selected_elements[-1] if game.selected_elements else None
+
+    if size == "stress":
+        game.selected_lab_elements = list(game.elements)
+    elif size == "typical":
+        game.selected_lab_elements = rng.sample(game.elements, 4)
+    else:
+        game.selected_lab_elements = []
+    game.combination_result = dict(game.compounds[0], tokens=6) if game.compounds else None
+    game.ore_chunks = 0 if size == "empty" else 9999 if size == "stress" else 250
+    game.tokens = 0 if size == "empty" else 50
+    game.egg_level = 1
+    game.growth_level = 0
+
+def run_frame():
+    if game.current_screen == "slot_machine" and (not game.spinning or game.spin_elapsed > game.SPIN_DURATION - 0.5):
+        game.spin_reels()  # Keep the reels moving without ever settling into a payout
+    game.update_and_draw_frame(FRAME_DT, 30.0)
+    game.present_frame()
+
+def percentile(samples, pct):
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+def measure(screen_name, size, frames, warmup):
+    apply_state(size)
+    game.current_screen = screen_name
+    game.spinning = False
+    game.request_full_redraw()
+    for _ in range(warmup):
+        run_frame()
+
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        run_frame()
+        times.append((time.perf_counter() - start) * 1000)
+
+    alloc_peaks = []
+    tracemalloc.start()
+    for _ in range(max(5, frames // 4)):
+        tracemalloc.reset_peak()
+        baseline_bytes = tracemalloc.get_traced_memory()[0]
+        run_frame()
+        alloc_peaks.append(tracemalloc.get_traced_memory()[1] - baseline_bytes)
+    tracemalloc.stop()
+
+    return {
+        "mean_ms": statistics.fmean(times),
+        "p95_ms": percentile(times, 95),
+        "p99_ms": percentile(times, 99),
+        "alloc_kb": statistics.fmean(alloc_peaks) / 1024,
+    }
+
+def measure_save_latency(save_count, saves):
+    """Time save_game() on one game while save_count saves exist.
+
+    submit is what the render thread pays; durable runs until the writer
+    thread has committed the save.
+    """
+    apply_state("typical")
+    write_saves(random.Random(save_count), save_count)
+    submit_times, durable_times = [], []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(saves):
+            game.ore_chunks += 1  # Unchanged state would be skipped, not saved
+            start = time.perf_counter()
+            game.save_game("game_20240101_000000")
+            submitted = time.perf_counter()
+            game.save_writer.flush()
+            submit_times.append((submitted - start) * 1000)
+            durable_times.append((time.perf_counter() - start) * 1000)
+    return {"submit_ms": statistics.fmean(submit_times), "mean_ms": statistics.fmean(durable_times),
+            "p95_ms": percentile(durable_times, 95), "p99_ms": percentile(durable_times, 99)}
+
+def measure_save_format(save):
+    """Size and decode time of one save as JSON text and as a binary record."""
+    text = json.dumps(save)
+    record = game.encode_save(save)
+    runs = 2000
+    start = time.perf_counter()
+    for _ in range(runs):
+        json.loads(text)
+    json_us = (time.perf_counter() - start) / runs * 1e6
+    start = time.perf_counter()
+    for _ in range(runs):
+        game.decode_save(record)
+    binary_us = (time.perf_counter() - start) / runs * 1e6
+    return len(text), len(record), json_us, binary_us
+
+def scan_compounds(selected_elements):
+    """The linear scan combine_elements() used before the compound index, kept for comparison."""
+    selected_symbols = [e["symbol"] for e in selected_elements]
+    element_counts = {symbol: selected_symbols.count(symbol) for symbol in set(selected_symbols)}
+    matches = []
+    for compound in game.compounds:
+        if set(compound["elements"]) == set(selected_symbols):
+            counts = {element: compound["formula"].count(element) for element in set(compound["elements"])}
+            if all(element_counts[element] >= count for element, count in counts.items()):
+                matches.append(compound)
+    return matches
+
+def measure_combine(compound_count, lookups):
+    """Formula parse and index build time, and per-combine cost with compound_count compounds loaded.
+
+    Half the selections are drawn from real compounds (with a spare atom of
+    each element so the counts are met), half are random element pairs.
+    """
+    rng = random.Random(compound_count)
+    loaded = synthetic_compounds(rng, compound_count, 5, pool=SYMBOLS)
+    game.set_element_data(synthetic_elements(rng), loaded)
+    by_symbol = {e["symbol"]: e for e in game.elements}
+    selections = []
+    for i in range(lookups):
+        symbols = rng.choice(loaded)["elements"] * 4 if i % 2 else rng.sample(SYMBOLS, 2)
+        selections.append([by_symbol[symbol] for symbol in symbols])
+    candidates = sum(len(game.compound_index.by_signature.get(frozenset(e["symbol"] for e in selection), ())) for selection in selections)
+
+    start = time.perf_counter()
+    for selection in selections:
+        game.combine_elements(selection)
+    indexed_us = (time.perf_counter() - start) / lookups * 1e6
+    scan_runs = max(1, lookups // 100)
+    start = time.perf_counter()
+    for selection in selections[:scan_runs]:
+        scan_compounds(selection)
+    scan_us = (time.perf_counter() - start) / scan_runs * 1e6
+    return game.compound_index.build_ms, indexed_us, scan_us, candidates / lookups
+
+def measure_craft(compound_count, updates):
+    """Cost of the lab hint queries with compound_count compounds loaded.
+
+    sync is the first inventory load from empty; update is one element's
+    quantity changing by one; query is both hint lists, as the panel asks.
+    """
+    rng = random.Random(compound_count)
+    game.set_element_data(synthetic_elements(rng), synthetic_compounds(rng, compound_count, 5, pool=SYMBOLS[:60]))
+    query = game.craft_query
+    inventory = {symbol: rng.randint(0, 4) for symbol in SYMBOLS[:60]}
+    start = time.perf_counter()
+    query.sync(inventory)
+    sync_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for _ in range(updates):
+        symbol = rng.choice(SYMBOLS[:60])
+        inventory[symbol] = max(0, inventory[symbol] + rng.choice((-1, 1)))
+        query.sync(inventory)
+    update_us = (time.perf_counter() - start) / updates * 1e6
+
+    masks = [0] + [query.mask_of(rng.sample(SYMBOLS[:60], 1)) for _ in range(9)]
+    start = time.perf_counter()
+    for mask in masks:
+        query.craftable_now(mask, game.LAB_HINT_ROWS)
+        query.one_element_away(mask, game.LAB_HINT_ROWS)
+    query_ms = (time.perf_counter() - start) / len(masks) * 1000
+    return sync_ms, update_us, query_ms, len(query.craftable), len(query.one_away)
+
+def synthetic_recipe_graph(rng, count):
+    """count compounds, each with up to two extra recipes built from random other compounds.
+
+    References point both ways, so the graph is full of cycles; a small ORE
+    cost per recipe keeps some multi-step routes cheaper than raw elements and
+    some dearer.
+    """
+    loaded = synthetic_compounds(rng, count, 5, pool=SYMBOLS[:60])
+    for compound in loaded:
+        compound["recipes"] = [
+            {"compounds": {rng.choice(loaded)["name"]: rng.randint(1, 2) for _ in range(rng.randint(1, 3))},
+             "elements": {rng.choice(SYMBOLS[:60]): 1} if rng.random() < 0.3 else {},
+             "ore": rng.randint(0, 3)}
+            for _ in range(rng.randint(0, 2))
+        ]
+    return loaded
+
+def measure_synthesis(compound_count, plans):
+    """Planner build time, a full solve with and without some elements for sale, and cached plan lookups."""
+    rng = random.Random(compound_count)
+    loaded = synthetic_recipe_graph(rng, compound_count)
+    # Cheap, dear and unavailable elements, so some compounds are only reachable in several steps
+    prices = {symbol: rng.choice((1, 1, 2, 5, 20)) for symbol in SYMBOLS[:50]}
+    game.set_element_data(synthetic_elements(rng), loaded)
+    start = time.perf_counter()
+    planner = game.get_synthesis_planner()
+    build_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    planner.solve(prices)
+    solve_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    planner.solve({symbol: 1 for symbol in SYMBOLS[:30]})
+    restricted_ms = (time.perf_counter() - start) * 1000
+
+    targets = [rng.choice(loaded) for _ in range(plans)]
+    start = time.perf_counter()
+    found = [planner.plan(compound, prices) for compound in targets]
+    plan_us = (time.perf_counter() - start) / plans * 1e6
+    found = [plan for plan in found if plan]
+    multi_step = sum(len(steps) > 1 for _, steps in found)
+    return build_ms, solve_ms, restricted_ms, plan_us, len(planner.reachable(prices)), multi_step / max(1, len(found))
+
+def write_compound_export(path, megabytes):
+    """Write a compounds.json of roughly megabytes size, one long-description compound at a time."""
+    rng = random.Random("export")
+    size = 0
+    with open(path, "w") as f:
+        f.write("[")
+        i = 0
+        while size < megabytes * 1024 * 1024:
+            compound = synthetic_compounds(rng, 1, 300, pool=SYMBOLS)[0]
+            compound["name"] = f"Compound {i}"
+            text = ("," if i else "") + json.dumps(compound)
+            f.write(text)
+            size += len(text)
+            i += 1
+        f.write("]")
+    return i
+
+def measure_stream(path):
+    """Load time and peak traced memory for json.load and for CompoundStore, plus the index build after each."""
+    results = {}
+    for loader in ("json.load", "stream"):
+        for traced in (False, True):
+            if traced:
+                tracemalloc.start()
+            start = time.perf_counter()
+            if loader == "json.load":
+                with open(path) as f:
+                    loaded = json.load(f)
+            else:
+                loaded = game.CompoundStore(path).compounds
+            load_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            game.CompoundIndex(loaded)
+            index_ms = (time.perf_counter() - start) * 1000
+            if traced:
+                peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+                tracemalloc.stop()
+                results[loader]["peak_mb"] = peak_mb
+            else:
+                results[loader] = {"load_ms": load_ms, "index_ms": index_ms}
+            del loaded
+    return results
+
+def compare(results, baseline, tolerance, slack_ms):
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        limit = baseline[key]["p95_ms"] * (1 + tolerance) + slack_ms
+        if result["p95_ms"] > limit:
+            regressions.append(f"{key}: p95 {result['p95_ms']:.2f} ms > {limit:.2f} ms (baseline {baseline[key]['p95_ms']:.2f} ms)")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--screens", nargs="+", choices=SCREENS, default=SCREENS)
+    parser.add_argument("--sizes", nargs="+", choices=SIZES, default=SIZES)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative p95 slowdown")
+    parser.add_argument("--slack-ms", type=float, default=0.5, help="absolute p95 slack, to absorb timer noise on tiny frames")
+    parser.add_argument("--save-latency", action="store_true", help="time save_game() as the save count grows instead of drawing screens")
+    parser.add_argument("--save-format", action="store_true", help="compare JSON and binary save size and decode time instead of drawing screens")
+    parser.add_argument("--craft", action="store_true", help="time the lab hint queries as the compound count grows instead of drawing screens")
+    parser.add_argument("--stream", type=int, metavar="MB", help="compare json.load with the streaming compound loader on a generated export of this size instead of drawing screens")
+    parser.add_argument("--synthesis", action="store_true", help="time the multi-step synthesis planner on generated recipe graphs instead of drawing screens")
+    parser.add_argument("--combine", action="store_true", help="time combine_elements() as the compound count grows instead of drawing screens")
+    args = parser.parse_args(argv)
+
+    # Saves and preference files land in a scratch directory, never in the player's
+    os.chdir(tempfile.mkdtemp(prefix="elementegg-bench-"))
+    game.init_game(headless=True)
+    if game.EGG_ATLAS_ENABLED:
+        game.egg_creature.bake_atlas()
+
+    if args.save_format:
+        rng = random.Random("format")
+        profiles = {
+            "typical": synthetic_save(rng, rng.sample(SYMBOLS, 3)),
+            "largest": dict(synthetic_save(rng, list(SYMBOLS[:6])), lifetime_fed={symbol: rng.randint(1, 99999) for symbol in SYMBOLS}),
+        }
+        print(f"{'profile':<10} {'json B':>7} {'binary B':>9} {'ratio':>6} {'json us':>8} {'binary us':>10}")
+        for profile, save in profiles.items():
+            json_bytes, binary_bytes, json_us, binary_us = measure_save_format(save)
+            print(f"{profile:<10} {json_bytes:7d} {binary_bytes:9d} {json_bytes / binary_bytes:5.1f}x {json_us:8.1f} {binary_us:10.1f}")
+        return 0
+
+    if args.combine:
+        print(f"{'compounds':>10} {'parse+index ms':>15} {'combine us':>11} {'scan us':>10} {'candidates':>11}")
+        for compound_count in COMBINE_COUNTS:
+            build_ms, indexed_us, scan_us, candidates = measure_combine(compound_count, 20000)
+            print(f"{compound_count:>10} {build_ms:15.1f} {indexed_us:11.2f} {scan_us:10.1f} {candidates:11.2f}")
+        return 0
+
+    if args.stream:
+        path = os.path.abspath("compounds.json")
+        count = write_compound_export(path, args.stream)
+        print(f"{count} compounds, {os.path.getsize(path) / (1024 * 1024):.0f} MB")
+        print(f"{'loader':<10} {'load ms':>9} {'index ms':>9} {'peak MB':>8}")
+        try:
+            for loader, result in measure_stream(path).items():
+                print(f"{loader:<10} {result['load_ms']:9.0f} {result['index_ms']:9.0f} {result['peak_mb']:8.1f}")
+        finally:
+            os.remove(path)
+        return 0
+
+    if args.synthesis:
+        print(f"{'compounds':>10} {'build ms':>9} {'solve ms':>9} {'restricted ms':>14} {'plan us':>8} {'reachable':>10} {'multi-step':>11}")
+        for compound_count in SYNTHESIS_COUNTS:
+            build_ms, solve_ms, restricted_ms, plan_us, reachable, multi_step = measure_synthesis(compound_count, 2000)
+            print(f"{compound_count:>10} {build_ms:9.1f} {solve_ms:9.1f} {restricted_ms:14.1f} {plan_us:8.1f} {reachable:>10} {multi_step:10.0%}")
+        return 0
+
+    if args.craft:
+        print(f"{'compounds':>10} {'sync ms':>8} {'update us':>10} {'query ms':>9} {'craftable':>10} {'1 away':>7}")
+        for compound_count in CRAFT_COUNTS:
+            sync_ms, update_us, query_ms, craftable, one_away = measure_craft(compound_count, 2000)
+            print(f"{compound_count:>10} {sync_ms:8.2f} {update_us:10.1f} {query_ms:9.2f} {craftable:>10} {one_away:>7}")
+        return 0
+
+    if args.save_latency:
+        print(f"{'saves':>8} {'submit ms':>10} {'durable ms':>11} {'p95 ms':>8} {'p99 ms':>8}")
+        for save_count in SAVE_LATENCY_COUNTS:
+            result = measure_save_latency(save_count, 200)
+            print(f"{save_count:>8} {result['submit_ms']:10.3f} {result['mean_ms']:11.3f} {result['p95_ms']:8.3f} {result['p99_ms']:8.3f}")
+        return 0
+
+    results = {}
+    print(f"{'screen':<18} {'size':<8} {'mean ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'alloc KB':>9}")
+    for screen_name in args.screens:
+        for size in args.sizes:
+            result = measure(screen_name, size, args.frames, args.warmup)
+            results[f"{screen_name}/{size}"] = result
+            print(f"{screen_name:<18} {size:<8} {result['mean_ms']:8.2f} {result['p95_ms']:8.2f} {result['p99_ms']:8.2f} {result['alloc_kb']:9.1f}")
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save-baseline to record one.")
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.tolerance, args.slack_ms)
+    if regressions:
+        print("\nREGRESSIONS:")
+        for regression in regressions:
+            print("  " + regression)
+        return 1
+    print("\nNo regressions against baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())